@@ -0,0 +1,48 @@
+import json
+from io import StringIO
+from urllib.parse import urlsplit
+
+import pytest
+from django.core.management import call_command
+from django.urls import resolve
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.django_db]
+
+VIEWS = (
+    'index', 'group_posts', 'group_posts deep page',
+    'group_posts deep cursor', 'group_posts load more', 'profile',
+    'post_detail', 'post_create', 'post_edit',
+)
+
+
+class TestViewBenchmark:
+
+    def run_benchmark(self, path, **options):
+        call_command(
+            'view_benchmark', posts=2000, authors=20, groups=5, requests=10,
+            output=str(path), stdout=StringIO(), **options
+        )
+        with open(path, encoding='utf-8') as source:
+            return json.load(source)['results']
+
+    def test_view_benchmark_report(self, tmp_path):
+        results = self.run_benchmark(tmp_path / 'baseline.json')
+        assert set(results) == set(VIEWS), (
+            'Замер должен покрывать все публичные страницы'
+        )
+        for name, stats in results.items():
+            assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'], (
+                f'{name}: перцентили должны расти'
+            )
+            budget = resolve(urlsplit(stats['url']).path).func.query_budget
+            assert stats['queries'] <= budget, (
+                f'{name}: {stats["queries"]} запросов при бюджете {budget}'
+            )
+
+    def test_view_benchmark_baseline(self, tmp_path):
+        baseline = tmp_path / 'baseline.json'
+        self.run_benchmark(baseline)
+        self.run_benchmark(
+            tmp_path / 'current.json', baseline=str(baseline),
+            max_regression=10 ** 6,
+        )
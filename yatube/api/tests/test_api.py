@@ -0,0 +1,94 @@
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+POSTS_FOR_TEST = 5
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(POSTS_FOR_TEST):
+            Post.objects.create(
+                text=f'Тестовый текст {i}', author=cls.author, group=cls.group
+            )
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def setUp(self):
+        self.client = Client()
+
+    def get_json(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return json.loads(b''.join(response.streaming_content))
+        return response.json()
+
+    def test_cursor_paging(self):
+        """Страницы по курсору проходят ленту без пропусков и повторов."""
+        urls = (
+            reverse('api:posts'),
+            reverse('api:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('api:profile_posts', kwargs={'username': self.author}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                first = self.get_json(url, limit=3)
+                second = self.get_json(url, limit=3, after=first['next'])
+                self.assertIsNone(second['next'])
+                self.assertEqual(
+                    [row['id'] for row in first['results']
+                     + second['results']],
+                    [post.id for post in self.posts],
+                )
+                self.assertEqual(first['results'][0]['author'], 'Автор')
+                self.assertEqual(first['results'][0]['group'], 'test_slug')
+
+    def test_multi_get(self):
+        """Посты по списку id отдаются в запрошенном порядке."""
+        ids = [self.posts[2].id, 0, self.posts[0].id]
+        data = self.get_json(
+            reverse('api:posts'), ids=','.join(map(str, ids))
+        )
+        self.assertEqual(
+            [row['id'] for row in data['results']], [ids[0], ids[2]]
+        )
+
+    def test_bad_parameters(self):
+        """Неверные параметры дают 400 с описанием ошибки."""
+        for params in ({'ids': '1,x'}, {'after': 'broken'}, {'limit': 0}):
+            with self.subTest(params=params):
+                response = self.client.get(reverse('api:posts'), params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+
+    def test_details(self):
+        """Группа, профиль и пост отдаются с числом постов."""
+        group = self.get_json(
+            reverse('api:group_detail', kwargs={'slug': self.group.slug})
+        )
+        self.assertEqual(group['posts_count'], POSTS_FOR_TEST)
+        profile = self.get_json(
+            reverse('api:profile', kwargs={'username': self.author})
+        )
+        self.assertEqual(profile['posts_count'], POSTS_FOR_TEST)
+        post = self.get_json(
+            reverse('api:post_detail', kwargs={'post_id': self.posts[0].id})
+        )
+        self.assertEqual(post['text'], self.posts[0].text)
+        groups = self.get_json(reverse('api:groups'))
+        self.assertEqual(groups['results'][0]['slug'], self.group.slug)
+        response = self.client.get(
+            reverse('api:profile', kwargs={'username': 'nobody'})
+        )
+        self.assertEqual(response.status_code, 404)
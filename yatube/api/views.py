@@ -0,0 +1,184 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from posts.counters import author_posts_count, get_count, group_scope
+from posts.models import Group, Post, User
+from posts.utils import CursorPaginator, decode_cursor, encode_cursor
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_IDS = 1000
+ID_BATCH_SIZE = 500
+STREAM_BUFFER_SIZE = 64 * 1024
+GROUP_FIELDS = ('id', 'title', 'slug', 'description')
+
+
+def dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+
+def error(message, status=400):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def post_rows(queryset):
+    """Посты в виде словарей: без создания моделей на каждую строку."""
+    return queryset.values(
+        'id', 'text', 'pub_date', 'updated',
+        'author__username', 'group__slug',
+    )
+
+
+def post_json(row):
+    row['author'] = row.pop('author__username')
+    row['group'] = row.pop('group__slug')
+    return row
+
+
+def buffered(chunks):
+    """Склеивает мелкие куски ответа, чтобы не писать в сокет по строке."""
+    buffer, size = [], 0
+    for chunk in chunks:
+        buffer.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    yield ''.join(buffer)
+
+
+def json_results(rows, tail=None):
+    """Объект {"results": [...]} по частям, по строке за раз.
+
+    tail вызывается после того, как все строки отданы, и возвращает
+    остальные поля объекта.
+    """
+    yield '{"results": ['
+    for number, row in enumerate(rows):
+        yield (',' if number else '') + dumps(row)
+    yield ']'
+    for key, value in (tail() if tail else {}).items():
+        yield f', {dumps(key)}: {dumps(value)}'
+    yield '}'
+
+
+def stream(rows, tail=None):
+    return StreamingHttpResponse(
+        buffered(json_results(rows, tail)), content_type='application/json'
+    )
+
+
+def limited(rows, limit, state):
+    """Отдаёт не больше limit строк и запоминает курсор следующей
+    страницы, если за ними есть ещё строка."""
+    last = None
+    for number, row in enumerate(rows):
+        if number == limit:
+            state['next'] = encode_cursor(last['pub_date'], last['id'])
+            return
+        last = row
+        yield row
+
+
+def post_page(request, queryset):
+    """Страница постов по курсору ?after= размером ?limit=."""
+    try:
+        limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return error('limit должен быть числом.')
+    if limit < 1:
+        return error('limit должен быть положительным.')
+    paginator = CursorPaginator(queryset, limit)
+    rows = paginator.object_list
+    after = request.GET.get('after')
+    if after:
+        cursor = decode_cursor(after)
+        if cursor is None:
+            return error('Неверный курсор.')
+        rows = paginator.cursor_queryset(cursor)
+    rows = post_rows(rows)[:limit + 1].iterator()
+    state = {'next': None}
+    return stream(map(post_json, limited(rows, limit, state)), lambda: state)
+
+
+def posts_by_ids(ids):
+    """Посты в порядке запрошенных id, по ID_BATCH_SIZE за запрос."""
+    for start in range(0, len(ids), ID_BATCH_SIZE):
+        batch = ids[start:start + ID_BATCH_SIZE]
+        found = {
+            row['id']: row
+            for row in post_rows(Post.objects.filter(pk__in=batch))
+        }
+        yield from (found[pk] for pk in batch if pk in found)
+
+
+@require_GET
+def posts(request):
+    if 'ids' not in request.GET:
+        return post_page(request, Post.objects.all())
+    try:
+        ids = [int(pk) for pk in request.GET['ids'].split(',') if pk]
+    except ValueError:
+        return error('ids должен быть списком чисел через запятую.')
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > MAX_IDS:
+        return error(f'Не больше {MAX_IDS} id за запрос.')
+    return stream(map(post_json, posts_by_ids(ids)))
+
+
+@require_GET
+def post_detail(request, post_id):
+    row = post_rows(Post.objects.filter(pk=post_id)).first()
+    if row is None:
+        return error('Пост не найден.', 404)
+    return JsonResponse(post_json(row))
+
+
+@require_GET
+def groups(request):
+    return stream(
+        Group.objects.order_by('pk').values(*GROUP_FIELDS).iterator()
+    )
+
+
+@require_GET
+def group_detail(request, slug):
+    row = Group.objects.filter(slug=slug).values(*GROUP_FIELDS).first()
+    if row is None:
+        return error('Группа не найдена.', 404)
+    row['posts_count'] = get_count(group_scope(row['id']))
+    return JsonResponse(row)
+
+
+@require_GET
+def group_posts(request, slug):
+    group = Group.objects.filter(slug=slug).only('pk').first()
+    if group is None:
+        return error('Группа не найдена.', 404)
+    return post_page(request, group.posts.all())
+
+
+@require_GET
+def profile(request, username):
+    author = User.objects.select_related('post_stats').filter(
+        username=username
+    ).first()
+    if author is None:
+        return error('Пользователь не найден.', 404)
+    return JsonResponse({
+        'username': author.username,
+        'full_name': author.get_full_name(),
+        'posts_count': author_posts_count(author),
+        'followers_count': author.post_stats.followers_count,
+    })
+
+
+@require_GET
+def profile_posts(request, username):
+    author = User.objects.filter(username=username).only('pk').first()
+    if author is None:
+        return error('Пользователь не найден.', 404)
+    return post_page(request, author.posts.all())
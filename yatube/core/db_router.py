@@ -0,0 +1,57 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+# Чтение с реплик включается только на время запроса: команды и прочий
+# код вне запроса всегда работают с основной базой.
+replica_reads = ContextVar('replica_reads', default=False)
+# Была ли в текущем запросе запись в основную базу.
+wrote = ContextVar('wrote', default=False)
+
+
+@contextmanager
+def primary_reads():
+    """Чтение основной базы внутри блока.
+
+    Нужно там, где прочитанное переживает запрос: страница с отстающей
+    реплики, сохранённая в кэш, осталась бы там до следующей записи.
+    """
+    token = replica_reads.set(False)
+    try:
+        yield
+    finally:
+        replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    """Чтение с реплик из DATABASE_REPLICAS, запись в основную базу.
+
+    После первой записи в запросе и в транзакциях чтение тоже идёт
+    в основную базу, чтобы код видел только что записанные данные.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if (not replicas or not replica_reads.get() or wrote.get()
+                or connections[PRIMARY].in_atomic_block):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        wrote.set(True)
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему вместе с данными при репликации.
+        return db not in settings.DATABASE_REPLICAS
@@ -0,0 +1,48 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную SQLite-базу в базы из DATABASE_REPLICAS. '
+        'Заменяет репликацию при локальной проверке чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять копирование каждые N секунд.',
+        )
+
+    def handle(self, interval, **options):
+        aliases = ['default', *settings.DATABASE_REPLICAS]
+        for alias in aliases:
+            if 'sqlite3' not in settings.DATABASES[alias]['ENGINE']:
+                raise CommandError(f'{alias}: нужна база SQLite.')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'Реплики не настроены, задайте YATUBE_SQLITE_REPLICAS.'
+            )
+        while True:
+            self.replicate()
+            if not interval:
+                return
+            time.sleep(interval)
+
+    def replicate(self):
+        source = sqlite3.connect(settings.DATABASES['default']['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                try:
+                    # backup копирует согласованный снимок базы,
+                    # даже если в неё в это время пишут.
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f'{alias}: обновлена')
+        finally:
+            source.close()
@@ -0,0 +1,75 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import Task
+from core.tasks import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет задачи из очереди core.tasks в пуле потоков, пока '
+        'не получит SIGINT или SIGTERM. Задачи попадают в очередь при '
+        'TASK_QUEUE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int,
+            help='Потоков-воркеров, по умолчанию TASK_WORKERS.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            help='Задач за раз, по умолчанию TASK_BATCH_SIZE.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.',
+        )
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Вернуть в очередь задачи, упавшие после всех повторов.',
+        )
+
+    def handle(self, threads, batch_size, once, retry_failed, **options):
+        if not settings.TASK_QUEUE:
+            self.stderr.write(
+                'TASK_QUEUE выключен: новые задачи выполняются сразу '
+                'и в очередь не попадают.'
+            )
+        if retry_failed:
+            returned = Task.objects.filter(status=Task.FAILED).update(
+                status=Task.PENDING, attempts=0
+            )
+            self.stdout.write(f'Возвращено в очередь: {returned}')
+        worker = Worker(batch_size)
+        if once:
+            done = 0
+            while True:
+                claimed = worker.run_once()
+                if not claimed:
+                    break
+                done += claimed
+            self.stdout.write(self.style.SUCCESS(f'Обработано задач: {done}'))
+            return
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: stop.set())
+        pool = [
+            threading.Thread(
+                target=worker.run, args=(stop,), name=f'task-worker-{number}'
+            )
+            for number in range(threads or settings.TASK_WORKERS)
+        ]
+        for thread in pool:
+            thread.start()
+        self.stdout.write(f'Воркеров: {len(pool)}, остановка по Ctrl+C')
+        # Сигналы обрабатываются только в главном потоке, поэтому он
+        # ждёт с таймаутом, а не блокируется в join.
+        while not stop.wait(1):
+            pass
+        for thread in pool:
+            thread.join()
+        self.stdout.write('Воркеры остановлены')
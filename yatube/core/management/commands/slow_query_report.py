@@ -0,0 +1,72 @@
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+LOG_BACKUPS = 3
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка журнала медленных запросов: запросы, сгруппированные по '
+        'отпечатку SQL, в порядке суммарного времени, с местами вызова '
+        'и планом.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=settings.SLOW_QUERY_LOG)
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, log, limit, **options):
+        queries = {}
+        for event in self.events(log):
+            query = queries.setdefault(event['fingerprint'], {
+                'sql': event['sql'], 'count': 0, 'total_ms': 0,
+                'max_ms': 0, 'plan': None, 'origins': Counter(),
+            })
+            query['count'] += 1
+            query['total_ms'] += event['duration_ms']
+            query['max_ms'] = max(query['max_ms'], event['duration_ms'])
+            query['plan'] = event['plan'] or query['plan']
+            query['origins'][(
+                event['view'], event['template'], event['location']
+            )] += 1
+        if not queries:
+            self.stdout.write('Медленных запросов нет.')
+            return
+        ranked = sorted(
+            queries.items(), key=lambda item: item[1]['total_ms'],
+            reverse=True,
+        )
+        for key, query in ranked[:limit]:
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{key}: {query["count"]} раз, всего '
+                f'{query["total_ms"]:.0f} мс, максимум '
+                f'{query["max_ms"]:.0f} мс'
+            ))
+            self.stdout.write(f'  {query["sql"]}')
+            for (view, template, location), count in (
+                query['origins'].most_common(3)
+            ):
+                self.stdout.write(
+                    f'  {count}× view {view or "-"}, шаблон '
+                    f'{template or "-"}, код {location or "-"}'
+                )
+            for line in (query['plan'] or 'план не снят').splitlines():
+                self.stdout.write(f'    {line}')
+
+    def events(self, log):
+        """События журнала и его ротированных копий, от старых к новым."""
+        paths = [f'{log}.{number}' for number in range(LOG_BACKUPS, 0, -1)]
+        for path in [*paths, log]:
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding='utf-8') as source:
+                for line in source:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # Строка, оборванная при ротации.
+                        continue
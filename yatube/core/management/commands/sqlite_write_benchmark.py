@@ -0,0 +1,108 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connections, transaction
+
+from core.write_queue import WriteQueue
+from posts.benchmarks import percentile
+
+PROFILES = {
+    'stock': {'ENGINE': 'django.db.backends.sqlite3'},
+    'tuned': {
+        'ENGINE': 'core.sqlite3',
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает конкурентную запись в SQLite со стандартными '
+        'настройками, с профилем core.sqlite3 и с профилем и очередью '
+        'потока-писателя. Каждый поток пишет в транзакциях, которые, как '
+        'создание поста, сначала читают, потом пишут. База создаётся во '
+        'временном каталоге.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=200,
+                            help='Транзакций на поток.')
+
+    def handle(self, threads, writes, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, profile, queued in (
+                ('стандартный SQLite', 'stock', False),
+                ('профиль core.sqlite3', 'tuned', False),
+                ('профиль и очередь записи', 'tuned', True),
+            ):
+                alias = f'bench_{profile}_{int(queued)}'
+                connections.databases[alias] = {
+                    **PROFILES[profile],
+                    'NAME': os.path.join(directory, f'{alias}.sqlite3'),
+                }
+                self.report(name, *self.run(alias, threads, writes, queued))
+                connections[alias].close()
+
+    def run(self, alias, threads, writes, queued):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE bench_post ('
+                'id INTEGER PRIMARY KEY, thread INTEGER, text TEXT)'
+            )
+        queue = WriteQueue() if queued else None
+        latencies, errors = [], []
+
+        def write(number):
+            with transaction.atomic(using=alias):
+                with connections[alias].cursor() as cursor:
+                    cursor.execute(
+                        'SELECT COUNT(*) FROM bench_post WHERE thread = %s',
+                        [number],
+                    )
+                    cursor.execute(
+                        'INSERT INTO bench_post (thread, text) '
+                        'VALUES (%s, %s)',
+                        [number, 'Текст поста ' * 20],
+                    )
+
+        def writer(number):
+            for _ in range(writes):
+                started = time.perf_counter()
+                try:
+                    if queue:
+                        queue.submit(write, number)
+                    else:
+                        write(number)
+                except DatabaseError as error:
+                    errors.append(error)
+                    continue
+                latencies.append(time.perf_counter() - started)
+            connections[alias].close()
+
+        workers = [
+            threading.Thread(target=writer, args=(number,))
+            for number in range(threads)
+        ]
+        started = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+        if queue:
+            queue.submit(lambda: connections[alias].close())
+        return latencies, errors, elapsed
+
+    def report(self, name, latencies, errors, elapsed):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        if latencies:
+            self.stdout.write(
+                f'  {len(latencies) / elapsed:.0f} записей/с, '
+                f'p50 {percentile(latencies, 0.5) * 1000:.2f} мс, '
+                f'p99 {percentile(latencies, 0.99) * 1000:.2f} мс'
+            )
+        self.stdout.write(f'  ошибок "database is locked": {len(errors)}')
@@ -0,0 +1,210 @@
+"""Метрики запросов по представлениям в формате Prometheus.
+
+Каждый процесс копит гистограммы в памяти. Если задан METRICS_DIR,
+процесс раз в METRICS_FLUSH_SECONDS сохраняет их в свой файл, а /metrics
+складывает файлы всех процессов: запрос к одному воркеру показывает
+метрики всего сервера.
+
+Приложения добавляют в /metrics свои метрики функциями, отмеченными
+декоратором collector.
+"""
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+HISTOGRAMS = {
+    'yatube_request_duration_seconds': (
+        'Время ответа.', DURATION_BUCKETS,
+    ),
+    'yatube_request_sql_queries': (
+        'SQL-запросов за запрос.', QUERY_BUCKETS,
+    ),
+    'yatube_request_sql_duration_seconds': (
+        'Время SQL-запросов за запрос.', DURATION_BUCKETS,
+    ),
+    'yatube_request_template_duration_seconds': (
+        'Время рендера шаблонов за запрос.', DURATION_BUCKETS,
+    ),
+    'yatube_response_size_bytes': (
+        'Размер ответа, кроме потоковых.', SIZE_BUCKETS,
+    ),
+    'yatube_task_duration_seconds': (
+        'Время выполнения пачки фоновых задач.', DURATION_BUCKETS,
+    ),
+    'yatube_task_batch_size': (
+        'Задач в пачке.', QUERY_BUCKETS,
+    ),
+}
+# Метка серий гистограммы, если это не имя view.
+LABELS = {
+    'yatube_task_duration_seconds': 'task',
+    'yatube_task_batch_size': 'task',
+}
+
+# Функции без аргументов, возвращающие метрики приложений в текстовом
+# формате Prometheus.
+collectors = []
+
+# Замеры текущего запроса, None вне запроса.
+current_sample = ContextVar('current_sample', default=None)
+
+
+class RequestSample:
+    """Время SQL и шаблонов одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def sql_wrapper(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries += 1
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        # После fork дочерний процесс начинает со своих пустых метрик
+        # и своего файла.
+        self.pid = os.getpid()
+        self.path = None
+        self.flushed = time.monotonic()
+        self.data = {}
+
+    def observe(self, view_name, values):
+        """values: имя гистограммы -> значение. Для гистограмм из LABELS
+        вместо имени view передаётся значение их метки."""
+        with self.lock:
+            if os.getpid() != self.pid:
+                self.reset()
+            for name, value in values.items():
+                buckets = HISTOGRAMS[name][1]
+                series = self.data.setdefault(name, {}).setdefault(
+                    view_name,
+                    {'buckets': [0] * (len(buckets) + 1), 'sum': 0,
+                     'count': 0},
+                )
+                series['buckets'][bisect.bisect_left(buckets, value)] += 1
+                series['sum'] += value
+                series['count'] += 1
+            due = (time.monotonic() - self.flushed
+                   >= settings.METRICS_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def flush(self):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        with self.lock:
+            if self.path is None:
+                os.makedirs(directory, exist_ok=True)
+                self.path = os.path.join(
+                    directory, f'metrics-{self.pid}-{time.time_ns()}.json'
+                )
+            content = json.dumps(self.data)
+            self.flushed = time.monotonic()
+            # Запись через временный файл: читатель не увидит половину.
+            descriptor, temporary = tempfile.mkstemp(dir=directory)
+            with os.fdopen(descriptor, 'w') as target:
+                target.write(content)
+            os.replace(temporary, self.path)
+
+    def collect(self):
+        """Метрики всех процессов, сложенные по гистограммам и view."""
+        if not settings.METRICS_DIR:
+            with self.lock:
+                return json.loads(json.dumps(self.data))
+        self.flush()
+        total = {}
+        pattern = os.path.join(settings.METRICS_DIR, 'metrics-*.json')
+        for path in glob.glob(pattern):
+            try:
+                with open(path) as source:
+                    data = json.load(source)
+            except (OSError, ValueError):
+                continue
+            for name, views in data.items():
+                for view_name, series in views.items():
+                    merged = total.setdefault(name, {}).setdefault(
+                        view_name,
+                        {'buckets': [0] * len(series['buckets']),
+                         'sum': 0, 'count': 0},
+                    )
+                    merged['buckets'] = [
+                        a + b for a, b in zip(merged['buckets'],
+                                              series['buckets'])
+                    ]
+                    merged['sum'] += series['sum']
+                    merged['count'] += series['count']
+        return total
+
+
+registry = Registry()
+
+
+def collector(func):
+    """Добавляет вывод func() в /metrics."""
+    collectors.append(func)
+    return func
+
+
+def exposition(data):
+    """Текстовый формат Prometheus."""
+    lines = []
+    for name, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} histogram')
+        for view_name, series in sorted(data.get(name, {}).items()):
+            label = f'{LABELS.get(name, "view")}="{view_name}"'
+            cumulative = 0
+            for bound, count in zip(
+                (*buckets, '+Inf'), series['buckets']
+            ):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{label},le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{name}_sum{{{label}}} {series["sum"]}')
+            lines.append(f'{name}_count{{{label}}} {series["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def queue_exposition(stats):
+    """Глубина очереди задач: stats из core.tasks.queue_stats."""
+    lines = [
+        '# HELP yatube_task_queue_depth Задач в очереди.',
+        '# TYPE yatube_task_queue_depth gauge',
+    ]
+    ages = []
+    for name, status, count, age in sorted(stats):
+        label = f'task="{name}",status="{status}"'
+        lines.append(f'yatube_task_queue_depth{{{label}}} {count}')
+        ages.append(f'yatube_task_oldest_age_seconds{{{label}}} {age:.3f}')
+    lines.append(
+        '# HELP yatube_task_oldest_age_seconds '
+        'Сколько ждёт самая старая задача.'
+    )
+    lines.append('# TYPE yatube_task_oldest_age_seconds gauge')
+    return '\n'.join(lines + ages) + '\n'
@@ -0,0 +1,106 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, slow_queries
+from .db_router import replica_reads, wrote
+
+STICKY_COOKIE = 'use_primary'
+
+
+class ReplicaReadsMiddleware:
+    """Включает чтение с реплик на время запроса.
+
+    После записи клиент получает cookie на REPLICA_STICKY_SECONDS, и
+    его запросы в это окно читают основную базу: пользователь сразу
+    видит свой пост, даже если реплика ещё не догнала основную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        reads = replica_reads.set(STICKY_COOKIE not in request.COOKIES)
+        writes = wrote.set(False)
+        try:
+            response = self.get_response(request)
+            if wrote.get():
+                response.set_cookie(
+                    STICKY_COOKIE, '1',
+                    max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True,
+                )
+            return response
+        finally:
+            replica_reads.reset(reads)
+            wrote.reset(writes)
+
+
+class MetricsMiddleware:
+    """Замеряет запрос: время, SQL, рендер шаблонов и размер ответа.
+
+    Замеры уходят в заголовок Server-Timing и в гистограммы по имени
+    view, которые отдаёт /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sample = metrics.RequestSample()
+        token = metrics.current_sample.set(sample)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(sample.sql_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.current_sample.reset(token)
+        duration = time.perf_counter() - started
+        response['Server-Timing'] = ', '.join((
+            f'total;dur={duration * 1000:.1f}',
+            f'sql;dur={sample.sql_time * 1000:.1f};'
+            f'desc="{sample.queries} queries"',
+            f'tpl;dur={sample.template_time * 1000:.1f}',
+        ))
+        match = request.resolver_match
+        values = {
+            'yatube_request_duration_seconds': duration,
+            'yatube_request_sql_queries': sample.queries,
+            'yatube_request_sql_duration_seconds': sample.sql_time,
+            'yatube_request_template_duration_seconds': sample.template_time,
+        }
+        if not response.streaming:
+            values['yatube_response_size_bytes'] = len(response.content)
+        # Имя view, а не путь: число рядов метрик не растёт с числом URL.
+        metrics.registry.observe(
+            match.view_name if match else 'unresolved', values
+        )
+        return response
+
+
+class SlowQueryMiddleware:
+    """Пишет медленные запросы в журнал, если задан SLOW_QUERY_MS."""
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = slow_queries.current_request.set(request)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        slow_queries.slow_query_wrapper
+                    ))
+                return self.get_response(request)
+        finally:
+            slow_queries.current_request.reset(token)
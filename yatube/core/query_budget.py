@@ -0,0 +1,116 @@
+from functools import wraps
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+
+# Управление транзакцией не считается запросом: число таких команд
+# зависит от вложенности atomic(), а не от работы view.
+TRANSACTION_CONTROL = (
+    'BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT'
+)
+# Планы, которые снимает журнал медленных запросов, — не работа view.
+NOT_COUNTED = (*TRANSACTION_CONTROL, 'EXPLAIN')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class CaptureAllQueries:
+    """CaptureQueriesContext сразу для всех баз из DATABASES.
+
+    Чтения, ушедшие на реплику, тоже считаются: иначе лишние запросы
+    view, которое читает реплику, не попали бы в бюджет.
+    """
+
+    def __enter__(self):
+        # Зеркала в тестах могут делить соединение с основной базой.
+        unique = {
+            id(connections[alias]): connections[alias]
+            for alias in connections
+        }
+        self.contexts = [
+            CaptureQueriesContext(connection)
+            for connection in unique.values()
+        ]
+        for context in self.contexts:
+            context.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        for context in reversed(self.contexts):
+            context.__exit__(*exc_info)
+
+    @property
+    def captured_queries(self):
+        return [
+            query
+            for context in self.contexts
+            for query in context.captured_queries
+        ]
+
+    def __iter__(self):
+        return iter(self.captured_queries)
+
+    def __len__(self):
+        return len(self.captured_queries)
+
+
+def format_queries(queries):
+    return '\n'.join(
+        f'{number}. {query["sql"]}'
+        for number, query in enumerate(queries, start=1)
+    )
+
+
+def check_budget(view_name, budget, queries):
+    queries = [
+        query for query in queries
+        if not query['sql'].startswith(NOT_COUNTED)
+    ]
+    if len(queries) > budget:
+        raise QueryBudgetExceeded(
+            f'{view_name}: {len(queries)} SQL-запросов при бюджете '
+            f'{budget}:\n{format_queries(queries)}'
+        )
+
+
+def query_budget(max_queries):
+    """Объявляет наибольшее число SQL-запросов на один вызов view.
+
+    Бюджет считается для худшего случая: авторизованный пользователь
+    и ещё не созданный счётчик постов.
+
+    При QUERY_BUDGET_ENFORCE = True запросы записываются, и превышение
+    бюджета завершается исключением QueryBudgetExceeded.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+                return view(request, *args, **kwargs)
+            with CaptureAllQueries() as queries:
+                response = view(request, *args, **kwargs)
+            check_budget(view.__qualname__, max_queries, queries)
+            return response
+
+        wrapper.query_budget = max_queries
+        return wrapper
+    return decorator
+
+
+class QueryBudgetTestMixin:
+    """Проверка бюджета запросов в тестах независимо от настроек."""
+
+    def assertWithinQueryBudget(self, client, url, method='get', **kwargs):
+        view = resolve(urlsplit(url).path).func
+        budget = getattr(view, 'query_budget', None)
+        self.assertIsNotNone(budget, f'Для {url} не объявлен query_budget')
+        with CaptureAllQueries() as queries:
+            response = getattr(client, method)(url, **kwargs)
+        check_budget(url, budget, queries)
+        return response
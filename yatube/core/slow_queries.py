@@ -0,0 +1,109 @@
+"""Журнал медленных SQL-запросов.
+
+Запросы дольше SLOW_QUERY_MS пишутся в логгер yatube.slow_queries
+строками JSON: текст запроса, его отпечаток, время, view, шаблон,
+строка кода проекта и план EXPLAIN QUERY PLAN. План снимается один раз
+на отпечаток в каждом процессе. Отчёт по журналу строит команда
+slow_query_report.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import traceback
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError
+
+logger = logging.getLogger('yatube.slow_queries')
+
+# Текущий запрос, чтобы записать имя его view.
+current_request = ContextVar('current_request', default=None)
+# Шаблон, который рендерится в эту минуту.
+current_template = ContextVar('current_template', default=None)
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+IN_LIST_RE = re.compile(r'\bIN \((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+SPACE_RE = re.compile(r'\s+')
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Обёртки вокруг выполнения запросов, а не места, где запрос сделан.
+INSTRUMENTATION = tuple(
+    os.path.join(PROJECT_DIR, 'core', name)
+    for name in ('metrics.py', 'middleware.py', 'query_budget.py',
+                 'slow_queries.py', 'sqlite3', 'template_backend.py')
+)
+explained = set()
+
+
+def normalize(sql):
+    """SQL без значений: запросы, отличающиеся только параметрами или
+    длиной списка IN, получают один текст."""
+    sql = STRING_RE.sub('?', sql.replace('%s', '?'))
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('IN (...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:16]
+
+
+def code_location():
+    """Ближайшая к запросу строка кода проекта вне Django."""
+    for frame in reversed(traceback.extract_stack()):
+        if (frame.filename.startswith(PROJECT_DIR)
+                and not frame.filename.startswith(INSTRUMENTATION)
+                and 'site-packages' not in frame.filename):
+            path = os.path.relpath(frame.filename, PROJECT_DIR)
+            return f'{path}:{frame.lineno}'
+    return None
+
+
+def explain(connection, sql, params):
+    if not sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError:
+        return None
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        # Собственные EXPLAIN журнала в него не пишутся.
+        if (elapsed >= settings.SLOW_QUERY_MS and not many
+                and not sql.startswith('EXPLAIN')):
+            record(context['connection'], sql, params, elapsed)
+
+
+def record(connection, sql, params, elapsed):
+    key = fingerprint(sql)
+    plan = None
+    if key not in explained:
+        explained.add(key)
+        plan = explain(connection, sql, params)
+    request = current_request.get()
+    match = request and request.resolver_match
+    logger.info(json.dumps({
+        'time': time.time(),
+        'fingerprint': key,
+        'sql': normalize(sql),
+        'params': [repr(value)[:200] for value in params or ()],
+        'duration_ms': round(elapsed, 3),
+        'database': connection.alias,
+        'view': match.view_name if match else None,
+        'template': current_template.get(),
+        'location': code_location(),
+        'plan': plan,
+    }, ensure_ascii=False))
@@ -0,0 +1,94 @@
+"""SQLite с профилем PRAGMA для продакшена.
+
+Подключается как ENGINE 'core.sqlite3'. В OPTIONS, помимо параметров
+sqlite3.connect, принимаются:
+
+pragmas — PRAGMA поверх PRAGMAS, выполняются на каждом новом соединении;
+transaction_mode — как начинать транзакции: DEFERRED, IMMEDIATE или
+    EXCLUSIVE;
+lock_retries — сколько раз повторять запрос, не дождавшийся блокировки.
+"""
+import random
+import time
+
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = {
+    # WAL: читатели не ждут писателя, запись — дозапись в журнал.
+    'journal_mode': 'wal',
+    # В режиме WAL fsync нужен только при контрольной точке.
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер в КиБ, а не в страницах.
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+LOCK_RETRIES = 3
+LOCK_RETRY_DELAY = 0.05
+CUSTOM_OPTIONS = ('pragmas', 'transaction_mode', 'lock_retries')
+
+
+def is_locked(error):
+    return 'locked' in str(error)
+
+
+class RetryingCursorWrapper(base.SQLiteCursorWrapper):
+    """Повторяет запрос с растущей паузой, если база занята дольше
+    busy_timeout.
+
+    Повторяются только запросы вне транзакции, в том числе BEGIN:
+    в начатой транзакции ошибка уходит наверх, и atomic() её откатывает.
+    """
+
+    retries = LOCK_RETRIES
+
+    def execute(self, query, params=None):
+        return self.retry(super().execute, query, params)
+
+    def executemany(self, query, param_list):
+        # Итератор параметров исчерпался бы первой попыткой.
+        return self.retry(super().executemany, query, list(param_list))
+
+    def retry(self, method, *args):
+        for attempt in range(self.retries + 1):
+            in_transaction = self.connection.in_transaction
+            try:
+                return method(*args)
+            except base.Database.OperationalError as error:
+                if (in_transaction or attempt == self.retries
+                        or not is_locked(error)):
+                    raise
+            # Случайная доля паузы разводит писателей, упёршихся
+            # в блокировку одновременно.
+            time.sleep(LOCK_RETRY_DELAY * 2 ** attempt * random.random())
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for option in CUSTOM_OPTIONS:
+            params.pop(option, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        options = self.settings_dict['OPTIONS']
+        pragmas = {**PRAGMAS, **options.get('pragmas', {})}
+        for name, value in pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def create_cursor(self, name=None):
+        cursor = self.connection.cursor(factory=RetryingCursorWrapper)
+        cursor.retries = self.settings_dict['OPTIONS'].get(
+            'lock_retries', LOCK_RETRIES
+        )
+        return cursor
+
+    def _start_transaction_under_autocommit(self):
+        # BEGIN IMMEDIATE сразу берёт блокировку записи и ждёт её по
+        # busy_timeout. Отложенная транзакция, начав писать после чтения,
+        # получает "database is locked" без ожидания.
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', '')
+        self.cursor().execute(f'BEGIN {mode}'.strip())
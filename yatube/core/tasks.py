@@ -0,0 +1,260 @@
+"""Фоновые задачи для побочных работ записи.
+
+Обработчик регистрируется декоратором task, задача ставится вызовом
+enqueue(name, **payload). С TASK_QUEUE задача сохраняется в таблицу Task
+в транзакции записи: откат записи отменяет и задачу, а зафиксированная
+задача переживает падение процесса. Выполняют её воркеры
+manage.py run_workers: пачками, с повторами и выдержкой между ними.
+
+Без TASK_QUEUE задача выполняется сразу, в транзакции записи, а фоновая —
+после фиксации в пуле потоков процесса, без повторов.
+"""
+import json
+import logging
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+
+from . import metrics
+from .models import Task
+
+logger = logging.getLogger('yatube.tasks')
+
+handlers = {}
+
+executor = None
+executor_lock = threading.Lock()
+
+# Задачи, которые воркер выполняет сейчас обработчиком без пачки.
+claimed = ContextVar('claimed', default=None)
+
+
+class LeaseLost(Exception):
+    """Срок задачи истёк, и её взял другой воркер."""
+
+
+def finish(tasks):
+    """Удаляет выполненные задачи, если они всё ещё за этим воркером.
+
+    Вызывается в транзакции работы задач: при потерянной аренде
+    LeaseLost откатывает работу, её зафиксирует новый владелец.
+    """
+    deleted, _ = Task.objects.filter(
+        pk__in=[task.pk for task in tasks], locked_by=tasks[0].locked_by
+    ).delete()
+    if deleted != len(tasks):
+        raise LeaseLost
+
+
+def complete():
+    """Удаляет из очереди выполняемую воркером задачу.
+
+    Обработчик без пачки сам управляет транзакциями и вызывает complete()
+    в последней из них, чтобы задача ушла из очереди вместе с результатом.
+    Вне воркера ничего не делает.
+    """
+    tasks = claimed.get()
+    if tasks:
+        finish(tasks)
+        claimed.set([])
+
+
+class Handler:
+    def __init__(self, func, batch, background):
+        self.func = func
+        self.batch = batch
+        self.background = background
+
+    def run(self, payloads):
+        if self.batch:
+            self.func(payloads)
+            return
+        for payload in payloads:
+            self.func(**payload)
+
+
+def task(name, batch=False, background=False):
+    """Регистрирует обработчик задачи name.
+
+    Обработчик пачки (batch=True) получает список payload всех задач
+    с этим именем, взятых воркером за раз, и выполняется в одной
+    транзакции с их удалением. Остальные вызываются с payload каждой
+    задачи вне транзакции и открывают свои, короткие: долгая работа
+    не держит блокировку записи. Фоновая задача (background=True)
+    и без очереди не выполняется во время запроса.
+    """
+    def register(func):
+        handlers[name] = Handler(func, batch, background)
+        return func
+    return register
+
+
+def enqueue(name, **payload):
+    handler = handlers[name]
+    if settings.TASK_QUEUE:
+        Task.objects.create(name=name, payload=json.dumps(payload))
+    elif handler.background:
+        transaction.on_commit(
+            lambda: get_executor().submit(run_in_thread, name, payload)
+        )
+    else:
+        handler.run([payload])
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.TASK_WORKERS, thread_name_prefix='tasks'
+            )
+        return executor
+
+
+def run_in_thread(name, payload):
+    close_old_connections()
+    try:
+        handlers[name].run([payload])
+    except Exception:
+        logger.exception('Задача %s %r не выполнена', name, payload)
+    finally:
+        close_old_connections()
+
+
+def retry_delay(attempts):
+    """Выдержка перед повтором растёт вдвое с каждой попыткой."""
+    return timedelta(
+        seconds=settings.TASK_RETRY_SECONDS * 2 ** (attempts - 1)
+    )
+
+
+class Worker:
+    """Берёт из таблицы пачки готовых задач и выполняет их."""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or settings.TASK_BATCH_SIZE
+
+    def claim(self):
+        """Помечает до batch_size готовых задач как взятые этим вызовом.
+
+        Задачу, срок которой истёк у упавшего воркера, можно взять снова.
+        Условие повторяется в UPDATE, поэтому две задачи не достанутся
+        двум воркерам и без блокировки строк.
+        """
+        now = timezone.now()
+        ready = (
+            Q(status=Task.PENDING, run_at__lte=now)
+            | Q(status=Task.RUNNING, locked_until__lt=now)
+        )
+        ids = list(Task.objects.filter(ready).order_by(
+            'run_at', 'pk'
+        ).values_list('pk', flat=True)[:self.batch_size])
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        Task.objects.filter(ready, pk__in=ids).update(
+            status=Task.RUNNING, locked_by=token,
+            locked_until=now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+            attempts=F('attempts') + 1,
+        )
+        return list(Task.objects.filter(
+            pk__in=ids, locked_by=token, status=Task.RUNNING
+        ).order_by('name', 'pk'))
+
+    def run_once(self):
+        """Выполняет одну пачку, возвращает число взятых задач."""
+        tasks = self.claim()
+        for name, group in groupby(tasks, key=lambda task: task.name):
+            self.run_tasks(name, list(group))
+        return len(tasks)
+
+    def run_tasks(self, name, tasks):
+        handler = handlers.get(name)
+        if handler is None:
+            self.failed(tasks, f'Нет обработчика задачи {name}', final=True)
+            return
+        # Обработчик пачки выполняется один раз на все задачи, остальные
+        # по одной: упавшая задача не повторяет соседние.
+        for part in [tasks] if handler.batch else [[task] for task in tasks]:
+            started = time.perf_counter()
+            payloads = [json.loads(task.payload) for task in part]
+            try:
+                if handler.batch:
+                    with transaction.atomic():
+                        handler.run(payloads)
+                        finish(part)
+                else:
+                    self.run_alone(handler, part, payloads)
+            except LeaseLost:
+                logger.warning('Задачу %s взял другой воркер', name)
+            except Exception:
+                logger.exception('Задача %s не выполнена', name)
+                self.failed(part, traceback.format_exc())
+            metrics.registry.observe(name, {
+                'yatube_task_duration_seconds':
+                    time.perf_counter() - started,
+                'yatube_task_batch_size': len(part),
+            })
+
+    def run_alone(self, handler, tasks, payloads):
+        token = claimed.set(list(tasks))
+        try:
+            handler.run(payloads)
+            # Обработчик не вызвал complete(): задача удаляется отдельно.
+            if claimed.get():
+                with transaction.atomic():
+                    finish(tasks)
+        finally:
+            claimed.reset(token)
+
+    def failed(self, tasks, error, final=False):
+        now = timezone.now()
+        for task in tasks:
+            if final or task.attempts >= settings.TASK_MAX_ATTEMPTS:
+                changes = {'status': Task.FAILED}
+            else:
+                changes = {
+                    'status': Task.PENDING,
+                    'run_at': now + retry_delay(task.attempts),
+                }
+            # Задачу, перехваченную другим воркером, не трогаем.
+            Task.objects.filter(pk=task.pk, locked_by=task.locked_by).update(
+                locked_by='', locked_until=None, last_error=error, **changes
+            )
+
+    def run(self, stop, poll=None):
+        """Работает, пока не выставлен stop; без задач ждёт poll секунд."""
+        poll = settings.TASK_POLL_SECONDS if poll is None else poll
+        while not stop.is_set():
+            # Воркер живёт долго, соединение обновляется как в запросе.
+            close_old_connections()
+            try:
+                done = self.run_once()
+            except Exception:
+                logger.exception('Очередь задач недоступна')
+                done = 0
+            if not done:
+                stop.wait(poll)
+        close_old_connections()
+
+
+def queue_stats():
+    """Число задач и возраст самой старой по имени и состоянию."""
+    now = timezone.now()
+    return [
+        (row['name'], row['status'], row['count'],
+         (now - row['oldest']).total_seconds())
+        for row in Task.objects.order_by().values('name', 'status').annotate(
+            count=Count('pk'), oldest=Min('run_at')
+        )
+    ]
@@ -0,0 +1,41 @@
+import time
+
+from django.template.backends import django
+
+from .metrics import current_sample
+from .slow_queries import current_template
+
+
+class Template(django.Template):
+    def render(self, context=None, request=None):
+        token = current_template.set(self.template.origin.template_name)
+        try:
+            return self.timed_render(context, request)
+        finally:
+            current_template.reset(token)
+
+    def timed_render(self, context, request):
+        sample = current_sample.get()
+        if sample is None:
+            return super().render(context, request)
+        # Вложенный рендер, например карточки поста из тега, уже
+        # учтён во времени внешнего шаблона.
+        sample.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            sample.template_depth -= 1
+            if not sample.template_depth:
+                sample.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django.DjangoTemplates):
+    """Шаблоны Django с замером времени рендера для метрик запроса
+    и именем шаблона для журнала медленных запросов."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
@@ -6,3 +6,17 @@ register = template.Library()
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+@register.simple_tag(takes_context=True)
+def page_url(context, **params):
+    """Ссылка на другую страницу списка с сохранением прочих параметров.
+
+    Параметры перехода (page, after, before) заменяются переданными,
+    остальные, например поисковый запрос, остаются как были.
+    """
+    query = context['request'].GET.copy()
+    for key in ('page', 'after', 'before'):
+        query.pop(key, None)
+    query.update(params)
+    return '?' + query.urlencode()
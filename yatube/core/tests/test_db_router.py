@@ -0,0 +1,109 @@
+import os
+import sqlite3
+import tempfile
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase,
+                         TransactionTestCase, override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from ..db_router import ReplicaRouter, replica_reads
+from ..middleware import STICKY_COOKIE, ReplicaReadsMiddleware
+from ..query_budget import CaptureAllQueries
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.reads = []
+
+    def view(self, write=False):
+        def get_response(request):
+            self.reads.append(self.router.db_for_read(None))
+            if write:
+                self.router.db_for_write(None)
+                self.reads.append(self.router.db_for_read(None))
+            return HttpResponse()
+        return ReplicaReadsMiddleware(get_response)
+
+    def test_reads_outside_request_use_primary(self):
+        """Вне запроса чтение идёт в основную базу."""
+        self.assertFalse(replica_reads.get())
+        self.assertEqual(self.router.db_for_read(None), 'default')
+        self.assertEqual(self.router.db_for_write(None), 'default')
+
+    def test_request_reads_replica_until_write(self):
+        """Запрос читает реплику, а после записи — основную базу
+        и получает cookie на окно чтения из основной базы."""
+        response = self.view(write=True)(self.factory.get('/'))
+        self.assertEqual(self.reads, ['replica', 'default'])
+        self.assertIn(STICKY_COOKIE, response.cookies)
+
+    def test_sticky_client_reads_primary(self):
+        """Клиент с cookie после записи читает основную базу."""
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        response = self.view()(request)
+        self.assertEqual(self.reads, ['default'])
+        self.assertNotIn(STICKY_COOKIE, response.cookies)
+        self.assertFalse(replica_reads.get())
+
+
+class LaggingReplicaTests(TransactionTestCase):
+    """Реплика — снимок тестовой базы, сделанный до новой записи."""
+    alias = 'replica'
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='Автор')
+        Post.objects.create(text='Старый пост', author=self.author)
+        # Счётчик постов создаётся при первом чтении; в снимке он уже
+        # должен быть, иначе чтение ленты станет записью.
+        Client().get(reverse('posts:index'))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, 'replica.sqlite3')
+        connection.ensure_connection()
+        snapshot = sqlite3.connect(path)
+        connection.connection.backup(snapshot)
+        snapshot.close()
+        connections.databases[self.alias] = {
+            **connections.databases['default'], 'NAME': path,
+        }
+        self.addCleanup(connections.databases.pop, self.alias)
+        self.addCleanup(connections.__delitem__, self.alias)
+        self.addCleanup(lambda: connections[self.alias].close())
+        self.new_post = Post.objects.create(
+            text='Новый пост', author=self.author
+        )
+        cache.clear()
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_stale_replica_page_not_cached(self):
+        """Промах кэша лент читает основную базу: страница с отстающей
+        реплики не попадает в кэш нового поколения."""
+        client = Client()
+        response = client.get(
+            reverse('api:post_detail', kwargs={'post_id': self.new_post.pk})
+        )
+        self.assertEqual(response.status_code, 404, 'реплика не отстаёт')
+        for _ in range(2):
+            response = client.get(reverse('posts:index'))
+            self.assertContains(response, 'Новый пост')
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_budget_counts_replica_queries(self):
+        """Бюджет запросов учитывает и чтения с реплики."""
+        url = reverse('api:post_detail', kwargs={'post_id': self.new_post.pk})
+        with CaptureQueriesContext(connections[self.alias]) as replica, \
+                CaptureAllQueries() as queries:
+            Client().get(url)
+        self.assertTrue(replica.captured_queries)
+        for query in replica:
+            self.assertIn(query, queries.captured_queries)
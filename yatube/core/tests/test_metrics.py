@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ..metrics import registry
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='Автор')
+        Post.objects.create(text='Тестовый текст', author=author)
+
+    def setUp(self):
+        registry.reset()
+        self.client = Client()
+
+    def test_server_timing_header(self):
+        """Ответ содержит время запроса, SQL и шаблонов."""
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'sql;dur=', 'tpl;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, timing)
+
+    def test_histograms_by_view_name(self):
+        """/metrics отдаёт гистограммы по имени view."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        self.client.get('/no-such-page/')
+        content = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            content,
+        )
+        self.assertIn(
+            'yatube_request_sql_queries_bucket'
+            '{view="posts:index",le="+Inf"} 2',
+            content,
+        )
+        self.assertIn('{view="unresolved"}', content)
+
+    def test_processes_are_merged(self):
+        """С METRICS_DIR складываются метрики всех процессов."""
+        with tempfile.TemporaryDirectory() as directory:
+            buckets = [0] * 12
+            buckets[0] = 3
+            other = {'yatube_request_duration_seconds': {
+                'posts:index': {'buckets': buckets, 'sum': 0.01, 'count': 3},
+            }}
+            with open(os.path.join(directory, 'metrics-1-1.json'),
+                      'w') as target:
+                json.dump(other, target)
+            with override_settings(METRICS_DIR=directory):
+                self.client.get(reverse('posts:index'))
+                content = self.client.get(reverse('metrics')).content
+            self.assertIn(
+                'yatube_request_duration_seconds_count'
+                '{view="posts:index"} 4',
+                content.decode(),
+            )
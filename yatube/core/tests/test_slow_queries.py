@@ -0,0 +1,60 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ..slow_queries import fingerprint
+
+
+class SlowQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='Автор')
+        Post.objects.create(text='Тестовый текст', author=author)
+
+    def test_fingerprint_ignores_values(self):
+        """Запросы с разными значениями и длиной IN дают один отпечаток."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2) AND s = 'a'"),
+            fingerprint('SELECT * FROM t WHERE id IN (%s) AND s = %s'),
+        )
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_logged_with_origin(self):
+        """Медленный запрос пишется с view, шаблоном и планом."""
+        with self.assertLogs('yatube.slow_queries') as logs:
+            Client().get(reverse('posts:index'))
+        events = [json.loads(record.getMessage()) for record in logs.records]
+        post_query = next(
+            event for event in events
+            if event['sql'].startswith('SELECT "posts_post"."id"')
+        )
+        self.assertEqual(post_query['view'], 'posts:index')
+        self.assertEqual(post_query['template'], 'posts/index.html')
+        self.assertIsNotNone(post_query['location'])
+
+    def test_report_groups_by_fingerprint(self):
+        """Отчёт складывает события с одним отпечатком."""
+        event = {
+            'fingerprint': 'abc', 'sql': 'SELECT ?', 'duration_ms': 30,
+            'view': 'posts:index', 'template': None, 'location': None,
+            'plan': 'SCAN posts_post',
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            log = os.path.join(directory, 'slow.log')
+            with open(log, 'w', encoding='utf-8') as target:
+                for duration in (30, 50):
+                    target.write(json.dumps(
+                        {**event, 'duration_ms': duration}
+                    ) + '\n')
+            output = StringIO()
+            call_command('slow_query_report', log=log, stdout=output)
+        report = output.getvalue()
+        self.assertIn('abc: 2 раз, всего 80 мс, максимум 50 мс', report)
+        self.assertIn('SCAN posts_post', report)
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+import tempfile
+import threading
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase
+
+from ..write_queue import WriteQueue
+
+
+class SqliteProfileTests(TestCase):
+    def test_pragmas_applied(self):
+        """Новое соединение получает PRAGMA из профиля."""
+        with connection.cursor() as cursor:
+            for pragma, value in (('synchronous', 1), ('busy_timeout', 5000),
+                                  ('cache_size', -64000)):
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone()[0], value)
+
+
+class LockRetryTests(SimpleTestCase):
+    alias = 'lock_retry'
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+        connections.databases[self.alias] = {
+            'ENGINE': 'core.sqlite3',
+            'NAME': self.path,
+            # Без ожидания блокировки внутри SQLite работает только повтор.
+            'OPTIONS': {'pragmas': {'busy_timeout': 0}, 'lock_retries': 5},
+        }
+        self.addCleanup(connections.databases.pop, self.alias)
+        # Соединение кэшируется по имени, а база у каждого теста своя.
+        self.addCleanup(connections.__delitem__, self.alias)
+        self.addCleanup(lambda: connections[self.alias].close())
+
+    def test_locked_write_is_retried(self):
+        """Запись в занятую базу повторяется, пока блокировку
+        не отпустят."""
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE note (text TEXT)')
+        other = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self.addCleanup(other.close)
+        other.execute('BEGIN IMMEDIATE')
+        threading.Timer(0.02, other.execute, ['COMMIT']).start()
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('INSERT INTO note VALUES (%s)', ['текст'])
+            cursor.execute('SELECT COUNT(*) FROM note')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_locked_executemany_keeps_params(self):
+        """Повтор executemany получает все параметры, даже если их
+        передали генератором."""
+        with connections[self.alias].cursor() as cursor:
+            cursor.execute('CREATE TABLE note (text TEXT)')
+        other = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self.addCleanup(other.close)
+        other.execute('BEGIN IMMEDIATE')
+        threading.Timer(0.02, other.execute, ['COMMIT']).start()
+        with connections[self.alias].cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO note VALUES (%s)',
+                ([f'текст {number}'] for number in range(3)),
+            )
+            cursor.execute('SELECT COUNT(*) FROM note')
+            self.assertEqual(cursor.fetchone()[0], 3)
+
+
+class WriteQueueTests(SimpleTestCase):
+    def test_jobs_run_one_at_a_time(self):
+        """Задачи из разных потоков выполняются по одной в потоке-писателе."""
+        queue = WriteQueue()
+        running, seen = [], []
+
+        def job():
+            running.append(1)
+            seen.append((len(running), threading.current_thread().name))
+            running.pop()
+
+        threads = [
+            threading.Thread(target=queue.submit, args=(job,))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(set(seen), {(1, 'sqlite-writer')})
+        with self.assertRaises(ZeroDivisionError):
+            queue.submit(lambda: 1 / 0)
@@ -0,0 +1,156 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Follow, Post, User
+from posts.search import index_posts, search_posts
+from ..models import Task
+from ..tasks import Worker, complete, enqueue, task
+
+calls = []
+
+
+@task('tests.collect', batch=True)
+def collect(payloads):
+    calls.append(payloads)
+
+
+@task('tests.broken')
+def broken(number):
+    raise ValueError(f'Задача {number} сломана')
+
+
+@task('tests.own_transaction')
+def own_transaction(number, fail):
+    with transaction.atomic():
+        calls.append(number)
+        complete()
+    if fail:
+        raise ValueError(f'Задача {number} сломана после фиксации')
+
+
+@override_settings(TASK_QUEUE=True, TASK_MAX_ATTEMPTS=2)
+class TaskQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.follower = User.objects.create_user(username='Подписчик')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        calls.clear()
+        self.client = Client()
+
+    def test_post_side_effects_run_by_worker(self):
+        """Индекс и ленты подписок обновляет воркер, а не запрос."""
+        self.client.force_login(self.author)
+        self.client.post(
+            reverse('posts:post_create'), {'text': 'Отложенный пост'}
+        )
+        self.assertEqual(
+            sorted(Task.objects.values_list('name', flat=True)),
+            ['posts.fan_out', 'posts.index_posts'],
+        )
+        self.assertFalse(search_posts('отложенный').exists())
+        self.assertEqual(Worker().run_once(), 2)
+        self.assertFalse(Task.objects.exists())
+        self.assertTrue(search_posts('отложенный').exists())
+        self.client.force_login(self.follower)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Отложенный пост')
+
+    def test_rolled_back_write_drops_tasks(self):
+        """Задача откатывается вместе с транзакцией записи."""
+        try:
+            with transaction.atomic():
+                Post.objects.create(text='Откаченный пост', author=self.author)
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Task.objects.exists())
+
+    def test_batch_handler_gets_all_payloads(self):
+        """Обработчик пачки вызывается один раз на все задачи."""
+        for number in range(3):
+            enqueue('tests.collect', number=number)
+        Worker().run_once()
+        self.assertEqual(
+            calls, [[{'number': 0}, {'number': 1}, {'number': 2}]]
+        )
+
+    def test_failed_task_retried_with_backoff(self):
+        """Упавшая задача повторяется позже, а после всех попыток
+        остаётся в таблице с ошибкой."""
+        enqueue('tests.broken', number=1)
+        worker = Worker()
+        worker.run_once()
+        failed = Task.objects.get()
+        self.assertEqual(
+            (failed.status, failed.attempts), (Task.PENDING, 1)
+        )
+        self.assertGreater(failed.run_at, timezone.now())
+        self.assertIn('Задача 1 сломана', failed.last_error)
+        self.assertEqual(worker.run_once(), 0)
+        Task.objects.update(run_at=timezone.now() - timedelta(seconds=1))
+        worker.run_once()
+        failed.refresh_from_db()
+        self.assertEqual((failed.status, failed.attempts), (Task.FAILED, 2))
+
+    def test_expired_lease_reclaimed(self):
+        """Задачу упавшего воркера берёт другой после срока аренды."""
+        enqueue('tests.collect', number=1)
+        Task.objects.update(
+            status=Task.RUNNING, locked_by='lost',
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(Worker().run_once(), 1)
+        self.assertEqual(calls, [[{'number': 1}]])
+
+    def test_handler_completes_in_own_transaction(self):
+        """Обработчик без пачки удаляет задачу в своей транзакции,
+        а упавшая после неё задача не выполняется повторно."""
+        enqueue('tests.own_transaction', number=1, fail=False)
+        enqueue('tests.own_transaction', number=2, fail=True)
+        Worker().run_once()
+        self.assertEqual(calls, [1, 2])
+        self.assertFalse(Task.objects.exists())
+
+    def test_lost_lease_does_not_commit(self):
+        """Воркер, у которого задачу перехватили после срока аренды,
+        не удаляет её и не фиксирует свою работу."""
+        enqueue('tests.collect', number=1)
+        slow, fast = Worker(), Worker()
+        tasks = slow.claim()
+        Task.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        taken = fast.claim()
+        slow.run_tasks('tests.collect', tasks)
+        task = Task.objects.get()
+        self.assertEqual(task.locked_by, taken[0].locked_by)
+        self.assertEqual(task.status, Task.RUNNING)
+        fast.run_tasks('tests.collect', taken)
+        self.assertFalse(Task.objects.exists())
+
+    def test_reindex_is_idempotent(self):
+        """Повторная индексация нового поста не падает и не дублирует
+        запись индекса."""
+        post = Post.objects.create(text='Повторный пост', author=self.author)
+        payloads = [{'post_id': post.pk, 'created': True}]
+        index_posts(payloads)
+        index_posts(payloads)
+        self.assertEqual(list(search_posts('повторный')), [post])
+
+    def test_queue_depth_metrics(self):
+        """/metrics показывает глубину очереди по задачам."""
+        enqueue('tests.collect', number=1)
+        enqueue('tests.collect', number=2)
+        content = self.client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            'yatube_task_queue_depth{task="tests.collect",status="pending"} 2',
+            content,
+        )
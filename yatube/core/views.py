@@ -0,0 +1,13 @@
+from django.http import HttpResponse
+
+from . import metrics as request_metrics
+from .tasks import queue_stats
+
+
+def metrics(request):
+    return HttpResponse(
+        request_metrics.exposition(request_metrics.registry.collect())
+        + request_metrics.queue_exposition(queue_stats())
+        + ''.join(collect() for collect in request_metrics.collectors),
+        content_type='text/plain; version=0.0.4',
+    )
@@ -0,0 +1,71 @@
+import queue
+import threading
+from concurrent.futures import Future
+from contextvars import copy_context
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .db_router import wrote
+
+
+class WriteQueue:
+    """Очередь к единственному потоку-писателю.
+
+    SQLite допускает одного писателя на базу. Когда пишущих потоков
+    много, они ждут блокировку по busy_timeout и просыпаются вразнобой;
+    в очереди записи выполняются по порядку одна за другой.
+    """
+
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def submit(self, func, *args, **kwargs):
+        """Выполняет func в потоке-писателе и возвращает её результат."""
+        future = Future()
+        # Контекст вызывающего потока нужен, например, роутеру реплик.
+        self.jobs.put((future, copy_context(), func, args, kwargs))
+        self.start()
+        return future.result()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.work, name='sqlite-writer', daemon=True
+                )
+                self.thread.start()
+
+    def work(self):
+        while True:
+            future, context, func, args, kwargs = self.jobs.get()
+            # Поток живёт долго: соединение держится постоянным, но
+            # закрывается по CONN_MAX_AGE или после ошибки, как в запросе.
+            close_old_connections()
+            try:
+                future.set_result(context.run(func, *args, **kwargs))
+            except BaseException as error:
+                future.set_exception(error)
+
+
+write_queue = WriteQueue()
+
+
+def atomic_call(func, *args, **kwargs):
+    with transaction.atomic():
+        return func(*args, **kwargs)
+
+
+def serialized_write(func, *args, **kwargs):
+    """Выполняет запись func в транзакции.
+
+    При SQLITE_WRITE_QUEUE запись уходит в очередь потока-писателя.
+    """
+    if not settings.SQLITE_WRITE_QUEUE:
+        return atomic_call(func, *args, **kwargs)
+    result = write_queue.submit(atomic_call, func, *args, **kwargs)
+    # Запись шла в контексте потока-писателя.
+    wrote.set(True)
+    return result
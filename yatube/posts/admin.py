@@ -1,15 +1,53 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 
+from .counters import GLOBAL_SCOPE, get_count
 from .models import Post, Group
+from .search import match_expression, matching_ids
+
+ADMIN_COUNT_LIMIT = 10000
+
+
+class CountedPaginator(Paginator):
+    """Paginator списка постов без COUNT(*) по всей таблице.
+
+    Без фильтров число постов берётся из счётчика, а выборку с фильтрами
+    считаем не дальше ADMIN_COUNT_LIMIT строк: дальних страниц у такой
+    выборки не будет, зато подсчёт не упирается в размер таблицы.
+    """
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            return get_count(GLOBAL_SCOPE)
+        return self.object_list.order_by()[:ADMIN_COUNT_LIMIT].count()
 
 
 class PostAdmin (admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ['text', ]
     list_filter = ['pub_date', ]
+    date_hierarchy = 'pub_date'
+    paginator = CountedPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Ищет по полнотекстовому индексу вместо LIKE по всей таблице."""
+        expression = match_expression(search_term)
+        if not expression:
+            return queryset, False
+        return queryset.filter(pk__in=matching_ids(expression)), False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
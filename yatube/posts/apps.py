@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        # Обработчики фоновых задач нужны и воркерам run_workers.
+        from . import search, thumbnails, timeline  # noqa: F401
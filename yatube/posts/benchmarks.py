@@ -0,0 +1,183 @@
+import itertools
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.contrib import admin
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+from core.query_budget import NOT_COUNTED, CaptureAllQueries
+from .bulk import explicit_pub_date
+from .models import Group, Post, User
+from .utils import POSTS_PER_PAGE, CursorPaginator
+
+
+SEED_BATCH_SIZE = 5000
+FEED_INDEXES = (
+    'post_feed_idx',
+    'post_group_feed_idx',
+    'post_author_feed_idx',
+)
+
+plan_runs = itertools.count()
+
+
+def seed_posts(count, authors=100, groups=20, prefix='bench'):
+    """Быстро создаёт count постов через bulk_create.
+
+    Возвращает созданных авторов и группы. Сигналы при bulk_create
+    не отправляются, поэтому счётчики после вызова нужно сверить.
+    """
+    User.objects.bulk_create(
+        User(username=f'{prefix}-author-{i}') for i in range(authors)
+    )
+    Group.objects.bulk_create(
+        Group(title=f'{prefix} {i}', slug=f'{prefix}-{i}', description='')
+        for i in range(groups)
+    )
+    authors = list(User.objects.filter(username__startswith=prefix))
+    groups = list(Group.objects.filter(slug__startswith=prefix))
+    start = timezone.now() - timedelta(seconds=count)
+    with explicit_pub_date():
+        for offset in range(0, count, SEED_BATCH_SIZE):
+            Post.objects.bulk_create(
+                Post(
+                    text=f'Пост {i}',
+                    pub_date=start + timedelta(seconds=i),
+                    author=authors[i % len(authors)],
+                    group=groups[i % len(groups)] if i % 3 else None,
+                )
+                for i in range(offset, min(offset + SEED_BATCH_SIZE, count))
+            )
+    return authors, groups
+
+
+def drop_feed_indexes():
+    with connection.cursor() as cursor:
+        for name in FEED_INDEXES:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+
+
+def feed_querysets(group, author, depth=0.5):
+    """Запросы лент в том виде, в котором их выполняют представления.
+
+    Для каждой ленты берётся первая страница и страница, до которой
+    пользователь дошёл по курсору, пролистав долю depth ленты.
+    """
+    feeds = {
+        'index': Post.objects.all(),
+        'group_list': group.posts.all(),
+        'profile': author.posts.all(),
+    }
+    querysets = {}
+    for name, queryset in feeds.items():
+        paginator = CursorPaginator(queryset, POSTS_PER_PAGE)
+        querysets[f'{name} page 1'] = paginator.object_list[:POSTS_PER_PAGE]
+        offset = int(paginator.count * depth)
+        deep_post = paginator.object_list[offset:offset + 1].first()
+        if deep_post is not None:
+            cursor = (deep_post.pub_date, deep_post.pk)
+            querysets[f'{name} post {offset}'] = paginator.cursor_queryset(
+                cursor
+            )[:POSTS_PER_PAGE + 1]
+    return querysets
+
+
+def query_plan(queryset):
+    """План запроса SQLite по строкам.
+
+    Подготовленный EXPLAIN не перестраивается после DROP INDEX, поэтому
+    в текст запроса добавляется номер запуска и кэш выражений не срабатывает.
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'EXPLAIN QUERY PLAN /* {next(plan_runs)} */ {sql}', params
+        )
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+def uses_sort_step(plan):
+    return 'TEMP B-TREE' in plan.upper()
+
+
+def timed(func, repeat=5):
+    """Лучшее время выполнения func из repeat попыток, в миллисекундах."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+class LegacyPostAdmin(admin.ModelAdmin):
+    """Настройки PostAdmin до перехода на режим больших таблиц."""
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_editable = ('group',)
+    search_fields = ['text', ]
+    list_filter = ['pub_date', ]
+    empty_value_display = '-пусто-'
+
+
+def render_changelist(model_admin, user, params=None):
+    """Строит и рендерит страницу списка постов в админке без сервера."""
+    request = RequestFactory().get('/admin/posts/post/', params or {})
+    request.user = user
+    response = model_admin.changelist_view(request)
+    response.render()
+    return response
+
+
+def changelist_timing(model_admin, user, params=None, repeat=3):
+    """Лучшее время рендера страницы списка и число её SQL-запросов."""
+    with CaptureAllQueries() as queries:
+        render_changelist(model_admin, user, params)
+    elapsed = timed(
+        lambda: render_changelist(model_admin, user, params), repeat
+    )
+    return elapsed, len(queries)
+
+
+def percentile(values, share):
+    """Перцентиль по ближайшему рангу: значение из самой выборки."""
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+def view_timing(client, method, url, data=None, requests=100):
+    """Перцентили времени ответа view, его SQL-запросы и пик памяти.
+
+    Память меряется отдельным запросом: tracemalloc сильно замедляет
+    код и исказил бы время ответа.
+    """
+    call = getattr(client, method)
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = call(url, data)
+        latencies.append((time.perf_counter() - started) * 1000)
+    with CaptureAllQueries() as queries:
+        call(url, data)
+    # Журнал запросов очищается в начале следующего запроса.
+    query_count = sum(
+        not query['sql'].startswith(NOT_COUNTED)
+        for query in queries
+    )
+    tracemalloc.start()
+    try:
+        call(url, data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+        'p99_ms': percentile(latencies, 0.99),
+        'queries': query_count,
+        'peak_memory_kb': peak / 1024,
+    }
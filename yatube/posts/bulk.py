@@ -0,0 +1,89 @@
+from contextlib import contextmanager
+
+from django.core.management import call_command
+from django.db import transaction
+
+from . import feed_cache, group_choices
+from .models import Post
+from .search import index_posts_after
+from .timeline import fan_out_posts_after
+
+LOOKUP_BATCH_SIZE = 500
+
+
+@contextmanager
+def explicit_pub_date():
+    """Позволяет сохранять посты с заданной pub_date.
+
+    pub_date объявлена с auto_now_add и при вставке всегда получает
+    текущее время, поэтому на время вставки флаг снимается.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class IdMap:
+    """Отображение естественного ключа (username, slug) в id записи.
+
+    Неизвестные ключи целой пачки строк ищутся одним запросом
+    на LOOKUP_BATCH_SIZE ключей, ненайденные создаются через bulk_create.
+    Память растёт с числом разных ключей, а не с числом строк.
+    """
+
+    def __init__(self, model, field, make):
+        self.model = model
+        self.field = field
+        self.make = make
+        self.ids = {}
+        self.created = 0
+
+    def __getitem__(self, key):
+        return self.ids[key]
+
+    def fetch(self, keys):
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            self.ids.update(self.model.objects.filter(**{
+                f'{self.field}__in': keys[start:start + LOOKUP_BATCH_SIZE]
+            }).values_list(self.field, 'pk'))
+
+    def resolve(self, defaults):
+        """Находит или создаёт записи для ключей словаря defaults.
+
+        defaults отображает ключ в поля, с которыми создаётся
+        отсутствующая запись.
+        """
+        missing = [key for key in defaults if key not in self.ids]
+        self.fetch(missing)
+        new = [key for key in missing if key not in self.ids]
+        if not new:
+            return
+        self.model.objects.bulk_create(
+            (self.make(key, **defaults[key]) for key in new),
+            batch_size=LOOKUP_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        self.fetch(new)
+        self.created += len(new)
+
+
+def refresh_derived_data(last_id, group_slugs, usernames, stdout=None):
+    """Приводит производные данные в соответствие с постами,
+    вставленными через bulk_create после поста last_id.
+
+    group_slugs и usernames — группы и авторы новых постов, их ленты
+    сбрасываются в кэше.
+    """
+    call_command('reconcile_post_counts', stdout=stdout)
+    call_command('rebuild_author_stats', stdout=stdout)
+    with transaction.atomic():
+        index_posts_after(last_id)
+        fan_out_posts_after(last_id)
+    feed_cache.invalidate(
+        {feed_cache.INDEX_SCOPE, group_choices.CHOICES_SCOPE}
+        | {feed_cache.group_list_scope(slug) for slug in group_slugs}
+        | {feed_cache.profile_scope(name) for name in usernames}
+    )
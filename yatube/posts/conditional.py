@@ -0,0 +1,74 @@
+import hashlib
+
+from django.views.decorators.http import condition
+
+from core.db_router import primary_reads
+from .counters import GLOBAL_SCOPE, get_counter, group_scope
+from .models import AuthorStats, Group, Post
+
+
+def index_state():
+    return get_counter(GLOBAL_SCOPE)
+
+
+def group_list_state(slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is None:
+        return None
+    return get_counter(group_scope(group_id))
+
+
+def profile_state(username):
+    return AuthorStats.objects.filter(
+        author__username=username
+    ).values_list('posts_count', 'modified').first()
+
+
+def post_detail_state(post_id):
+    """Состояние поста и статистики его автора, показанной на странице."""
+    state = Post.objects.filter(pk=post_id).values_list(
+        'updated',
+        'author__post_stats__posts_count',
+        'author__post_stats__modified',
+    ).first()
+    if state is None:
+        return None
+    updated, posts_count, stats_modified = state
+    return posts_count, max(filter(None, (updated, stats_modified)))
+
+
+def conditional_page(state_of):
+    """Отвечает 304 до выполнения view, если страница не изменилась.
+
+    state_of получает именованные аргументы view и возвращает пару
+    (число постов, время последнего изменения) или None, если
+    проверить страницу заранее нельзя. Запрос выполняется один раз
+    на оба валидатора.
+    """
+    def page_state(request, **kwargs):
+        if not hasattr(request, 'page_state'):
+            # Валидаторы с отстающей реплики закрепили бы у клиента
+            # и в кэше старую страницу.
+            with primary_reads():
+                request.page_state = state_of(**kwargs)
+        return request.page_state
+
+    def etag(request, *args, **kwargs):
+        state = page_state(request, **kwargs)
+        if state is None:
+            return None
+        count, modified = state
+        # Шапка страницы зависит от пользователя.
+        user_id = request.user.pk if request.user.is_authenticated else 0
+        raw = f'{count}:{modified.isoformat()}:{user_id}'
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def last_modified(request, *args, **kwargs):
+        state = page_state(request, **kwargs)
+        if state is None or request.user.is_authenticated:
+            return None
+        return state[1]
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
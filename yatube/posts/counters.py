@@ -0,0 +1,134 @@
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import AuthorStats, Follow, Post, PostCount
+
+
+GLOBAL_SCOPE = 'all'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def post_scopes(group_id):
+    """Счётчики, в которые входит пост с такой группой."""
+    scopes = {GLOBAL_SCOPE}
+    if group_id is not None:
+        scopes.add(group_scope(group_id))
+    return scopes
+
+
+def scope_queryset(scope):
+    if scope == GLOBAL_SCOPE:
+        return Post.objects.all()
+    kind, pk = scope.split(':')
+    return Post.objects.filter(**{f'{kind}_id': pk})
+
+
+def get_counter(scope):
+    """Число постов в области и время последнего изменения в ней.
+
+    Отсутствующий счётчик один раз считается по таблице и сохраняется,
+    дальше его поддерживают сигналы.
+    """
+    counter = PostCount.objects.filter(scope=scope).values_list(
+        'count', 'modified'
+    ).first()
+    if counter is None:
+        counter = PostCount(
+            scope=scope,
+            count=scope_queryset(scope).count(),
+            modified=timezone.now(),
+        )
+        PostCount.objects.bulk_create([counter], ignore_conflicts=True)
+        return counter.count, counter.modified
+    return counter
+
+
+def get_count(scope):
+    """Число постов в области без COUNT(*) по таблице постов."""
+    return get_counter(scope)[0]
+
+
+def change_count(scopes, delta=0):
+    """Меняет счётчики на delta и отмечает время изменения областей."""
+    if not scopes:
+        return
+    counters = PostCount.objects.filter(scope__in=scopes)
+    if delta < 0:
+        counters = counters.filter(count__gte=-delta)
+    counters.update(count=F('count') + delta, modified=timezone.now())
+
+
+def drop_scope(scope):
+    PostCount.objects.filter(scope=scope).delete()
+
+
+def reconcile(scope):
+    count = scope_queryset(scope).count()
+    PostCount.objects.update_or_create(scope=scope, defaults={'count': count})
+    return count
+
+
+def actual_counts():
+    """Точные значения всех счётчиков, посчитанные двумя запросами."""
+    counts = {GLOBAL_SCOPE: Post.objects.count()}
+    rows = Post.objects.order_by().values('group').annotate(
+        total=Count('id')
+    ).exclude(group__isnull=True)
+    counts.update((group_scope(row['group']), row['total']) for row in rows)
+    return counts
+
+
+def author_posts_count(author):
+    """Число постов автора из его статистики.
+
+    Для автора, загруженного с select_related('post_stats'),
+    дополнительных запросов нет.
+    """
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        author.post_stats = create_author_stats(author.pk)
+        return author.post_stats.posts_count
+
+
+def change_author_count(author_id, delta=0):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        stats = stats.filter(posts_count__gte=-delta)
+    updated = stats.update(
+        posts_count=F('posts_count') + delta, modified=timezone.now()
+    )
+    if not updated and delta > 0:
+        create_author_stats(author_id)
+
+
+def touch_group_authors(group_id):
+    """Обновляет время изменения статистики авторов группы: профиль
+    и посты авторов показывают название группы."""
+    AuthorStats.objects.filter(author__posts__group_id=group_id).update(
+        modified=timezone.now()
+    )
+
+
+def change_followers_count(author_id, delta):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if delta < 0:
+        stats = stats.filter(followers_count__gte=-delta)
+    updated = stats.update(
+        followers_count=F('followers_count') + delta, modified=timezone.now()
+    )
+    if not updated and delta > 0:
+        create_author_stats(author_id)
+
+
+def create_author_stats(author_id):
+    stats = AuthorStats(
+        author_id=author_id,
+        posts_count=Post.objects.filter(author_id=author_id).count(),
+        followers_count=Follow.objects.filter(author_id=author_id).count(),
+    )
+    AuthorStats.objects.bulk_create([stats], ignore_conflicts=True)
+    return stats
@@ -0,0 +1,160 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+from core import metrics
+from core.db_router import primary_reads
+
+
+INDEX_SCOPE = 'index'
+PAGE_PARAMS = ('page', 'after', 'before')
+STATS_VIEWS = (
+    'index', 'group_list', 'profile',
+    'index_more', 'group_list_more', 'profile_more',
+)
+
+
+def group_list_scope(slug):
+    return f'group_list:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def post_feed_scopes(group_slug, username):
+    """Ленты, на которых показывается пост."""
+    scopes = {INDEX_SCOPE, profile_scope(username)}
+    if group_slug is not None:
+        scopes.add(group_list_scope(group_slug))
+    return scopes
+
+
+def scope_key(scope):
+    digest = hashlib.md5(scope.encode()).hexdigest()
+    return f'feed-generation:{digest}'
+
+
+def new_generation():
+    return time.time_ns()
+
+
+def generation(scope):
+    """Поколение ленты: меняется при каждой записи, влияющей на ленту.
+
+    Пропавшее из кэша поколение заменяется новым уникальным значением,
+    поэтому страницы прежних поколений больше не будут найдены.
+    """
+    key = scope_key(scope)
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, new_generation(), None)
+        value = cache.get(key)
+    return value
+
+
+def invalidate(scopes):
+    for scope in scopes:
+        key = scope_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, new_generation(), None)
+
+
+def invalidate_after_write(scopes):
+    """Сбрасывает ленты записи: сразу и ещё раз после её фиксации.
+
+    Запрос, промахнувшийся мимо кэша до фиксации, собирает страницу
+    из старых строк и сохраняет её под новым поколением; сброс после
+    фиксации такую страницу отбрасывает. Сразу лента сбрасывается для
+    чтений внутри самой транзакции записи.
+    """
+    scopes = set(scopes)
+    invalidate(scopes)
+    transaction.on_commit(lambda: invalidate(scopes))
+
+
+def page_key(view_name, scope, request):
+    params = '&'.join(
+        f'{name}={request.GET.get(name, "")}' for name in PAGE_PARAMS
+    )
+    digest = hashlib.md5(f'{scope}?{params}'.encode()).hexdigest()
+    return f'feed-page:{view_name}:{digest}:{generation(scope)}'
+
+
+def stats_key(view_name, result):
+    return f'feed-cache-stats:{view_name}:{result}'
+
+
+def record(view_name, result):
+    key = stats_key(view_name, result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def stats():
+    """Число попаданий и промахов кэша по каждой ленте."""
+    keys = [
+        stats_key(view_name, result)
+        for view_name in STATS_VIEWS for result in ('hit', 'miss')
+    ]
+    values = cache.get_many(keys)
+    return {
+        (view_name, result): values.get(stats_key(view_name, result), 0)
+        for view_name in STATS_VIEWS for result in ('hit', 'miss')
+    }
+
+
+@metrics.collector
+def exposition():
+    lines = [
+        '# HELP yatube_feed_cache_requests_total Обращения к кэшу лент.',
+        '# TYPE yatube_feed_cache_requests_total counter',
+    ]
+    for (view_name, result), value in stats().items():
+        lines.append(
+            'yatube_feed_cache_requests_total'
+            f'{{view="{view_name}",result="{result}"}} {value}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def cache_feed(view_name, scope_of):
+    """Кэширует страницы ленты для анонимных посетителей.
+
+    scope_of получает именованные аргументы view и возвращает ленту,
+    при записи в которую кэш страниц сбрасывается.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = page_key(view_name, scope_of(**kwargs), request)
+            cached = cache.get(key)
+            if cached is not None:
+                record(view_name, 'hit')
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            record(view_name, 'miss')
+            # Страница попадёт в кэш нового поколения, поэтому читается
+            # из основной базы, а не с реплики, которая могла отстать.
+            with primary_reads():
+                response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type']),
+                    settings.FEED_CACHE_TIMEOUT,
+                )
+            return response
+        return wrapper
+    return decorator
@@ -1,9 +1,39 @@
 from django import forms
+from django.conf import settings
+from django.db.models.fields import BLANK_CHOICE_DASH
+from django.urls import reverse
 
-from .models import Post
+from . import group_choices
+from .models import Group, Post
+
+
+class GroupSelect(forms.Select):
+    """Список групп из кэша group_choices, без запроса по всем группам.
+
+    Варианты нужны только для вывода поля и берутся при рендере: проверка
+    выбранной группы идёт запросом по первичному ключу. Если групп
+    больше GROUP_CHOICES_LIMIT, в списке остаётся выбранная группа,
+    а прочие подставляет поиск group_autocomplete.js.
+    """
+
+    def get_context(self, name, value, attrs):
+        choices = group_choices.cached_choices()
+        if len(choices) > settings.GROUP_CHOICES_LIMIT:
+            choices = []
+            if str(value).isdigit():
+                choices = list(Group.objects.filter(pk=value).values_list(
+                    'pk', 'title'
+                ))
+            attrs = {
+                **(attrs or {}),
+                'data-autocomplete': reverse('posts:group_autocomplete'),
+            }
+        self.choices = [*BLANK_CHOICE_DASH, *choices]
+        return super().get_context(name, value, attrs)
 
 
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
+        widgets = {'group': GroupSelect}
@@ -0,0 +1,52 @@
+"""Выбор группы в форме поста.
+
+Первые GROUP_CHOICES_LIMIT групп по названию лежат в кэше под
+поколением, которое меняется при записи групп, и форма рисует их без
+запроса к базе. Если групп больше, форма вместо полного списка
+показывает поиск: варианты по префиксу отдаёт group_autocomplete.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from . import feed_cache
+from .models import Group
+
+CHOICES_SCOPE = 'group_choices'
+CHOICES_TIMEOUT = 60 * 60 * 24
+AUTOCOMPLETE_LIMIT = 20
+# Больше любого символа: строки с префиксом p лежат в [p, p + MAX_CHAR).
+MAX_CHAR = '\U0010ffff'
+
+
+def cached_choices():
+    """До GROUP_CHOICES_LIMIT + 1 пар (id, название) по алфавиту:
+    лишняя пара показывает, что все группы в список не влезли."""
+    key = f'group-choices:{feed_cache.generation(CHOICES_SCOPE)}'
+    choices = cache.get(key)
+    if choices is None:
+        choices = list(Group.objects.order_by('title', 'pk').values_list(
+            'pk', 'title'
+        )[:settings.GROUP_CHOICES_LIMIT + 1])
+        cache.set(key, choices, CHOICES_TIMEOUT)
+    return choices
+
+
+def prefix(field, value):
+    """Префикс как диапазон: в отличие от LIKE ... ESCAPE, SQLite
+    проходит его по индексу."""
+    return Q(**{f'{field}__gte': value, f'{field}__lt': value + MAX_CHAR})
+
+
+def search_groups(query, limit=AUTOCOMPLETE_LIMIT):
+    """Группы, у которых название или slug начинается с query, без учёта
+    регистра.
+
+    Название сравнивается по его копии в нижнем регистре, title_lower,
+    и запрос проходит по её индексу.
+    """
+    query = query.strip().lower()
+    if not query:
+        return Group.objects.none()
+    condition = prefix('title_lower', query) | prefix('slug', query)
+    return Group.objects.filter(condition).order_by('title', 'pk')[:limit]
@@ -0,0 +1,60 @@
+from django.contrib import admin
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.benchmarks import LegacyPostAdmin, changelist_timing, seed_posts
+from posts.models import Post, User
+from posts.search import rebuild_index
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время рендера списка постов в админке со старыми '
+        'настройками PostAdmin и с текущими. Данные создаются во временной '
+        'транзакции и откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--groups', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, groups, repeat, **options):
+        self.stdout.write(f'Создание {posts} постов...')
+        seed_posts(posts, groups=groups)
+        rebuild_index()
+        user = User.objects.create_superuser(
+            'bench-admin', 'bench-admin@example.com', 'bench-admin'
+        )
+        year = Post.objects.latest('pub_date').pub_date.year
+        scenarios = {
+            'без фильтров': {},
+            'страница 50': {'p': '49'},
+            'год в date_hierarchy': {'pub_date__year': str(year)},
+            'поиск': {'q': 'пост 12345'},
+        }
+        admins = {
+            'старые настройки': LegacyPostAdmin(Post, admin.site),
+            'текущие настройки': admin.site._registry[Post],
+        }
+        for name, params in scenarios.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for title, model_admin in admins.items():
+                elapsed, queries = changelist_timing(
+                    model_admin, user, params, repeat
+                )
+                self.stdout.write(
+                    f'  {title}: {elapsed:.0f} мс, {queries} запросов'
+                )
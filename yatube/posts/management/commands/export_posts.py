@@ -0,0 +1,107 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Post
+
+EXPORT_FIELDS = (
+    ('id', 'id'),
+    ('text', 'text'),
+    ('author', 'author__username'),
+    ('group', 'group__slug'),
+    ('group_title', 'group__title'),
+    ('pub_date', 'pub_date'),
+    ('updated', 'updated'),
+)
+
+
+def open_target(path, compress):
+    if path == '-':
+        if compress:
+            return io.TextIOWrapper(
+                gzip.GzipFile(fileobj=sys.stdout.buffer, mode='wb'),
+                encoding='utf-8', newline='',
+            )
+        return nullcontext(sys.stdout)
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты с автором и группой в JSONL или CSV потоком, '
+        'в порядке id. С --since-id или --since-updated выгружаются только '
+        'новые или изменённые посты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или - для stdout.')
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--gzip', action='store_true', dest='compress',
+                            help='Сжать вывод; включается для путей .gz.')
+        parser.add_argument('--since-id', type=int,
+                            help='Только посты с id больше заданного.')
+        parser.add_argument('--since-updated',
+                            help='Только посты, изменённые начиная с этого '
+                                 'момента (ISO 8601).')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, path, format, compress, since_id, since_updated,
+               chunk_size, **options):
+        compress = compress or path.endswith('.gz')
+        name = path[:-len('.gz')] if path.endswith('.gz') else path
+        file_format = format or ('csv' if name.endswith('.csv') else 'jsonl')
+        # Порядок по первичному ключу читает таблицу подряд, без сортировки
+        # всех постов по pub_date из Meta.ordering.
+        posts = Post.objects.order_by('pk')
+        if since_id is not None:
+            posts = posts.filter(pk__gt=since_id)
+        if since_updated:
+            updated = parse_datetime(since_updated)
+            if updated is None:
+                raise CommandError(f'Неверная дата {since_updated!r}')
+            if timezone.is_naive(updated):
+                updated = timezone.make_aware(updated)
+            posts = posts.filter(updated__gte=updated)
+        rows = posts.values_list(
+            *(lookup for _, lookup in EXPORT_FIELDS)
+        ).iterator(chunk_size=chunk_size)
+        exported, last_id = 0, since_id
+        with open_target(path, compress) as target:
+            write = self.writer(target, file_format)
+            for row in rows:
+                write([export_value(value) for value in row])
+                exported += 1
+                last_id = row[0]
+        # Отчёт в stderr, чтобы не смешивать его с выгрузкой в stdout.
+        self.stderr.write(
+            f'Выгружено постов: {exported}, последний id: {last_id}'
+        )
+
+    def writer(self, target, file_format):
+        columns = [column for column, _ in EXPORT_FIELDS]
+        if file_format == 'csv':
+            writer = csv.writer(target)
+            writer.writerow(columns)
+            return writer.writerow
+
+        def write(row):
+            target.write(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False)
+            )
+            target.write('\n')
+        return write
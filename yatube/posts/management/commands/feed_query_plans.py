@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.benchmarks import (drop_feed_indexes, feed_querysets, query_plan,
+                              seed_posts, timed, uses_sort_step)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы и время запросов лент с составными индексами '
+        'и без них. Данные создаются во временной транзакции и '
+        'откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--depth', type=float, default=0.5)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, depth, repeat, **options):
+        self.stdout.write(f'Создание {posts} постов...')
+        authors, groups = seed_posts(posts)
+        querysets = feed_querysets(groups[1], authors[1], depth)
+        with_indexes = self.measure(querysets, repeat)
+        drop_feed_indexes()
+        without_indexes = self.measure(querysets, repeat)
+        for name in querysets:
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for title, results in (('без индексов', without_indexes),
+                                   ('с индексами', with_indexes)):
+                elapsed, plan = results[name]
+                step = 'обход индекса'
+                if uses_sort_step(plan):
+                    step = 'сортировка'
+                self.stdout.write(f'  {title}: {elapsed:.2f} мс, {step}')
+                for line in plan.splitlines():
+                    self.stdout.write(f'    {line}')
+
+    def measure(self, querysets, repeat):
+        return {
+            name: (
+                timed(lambda: list(queryset.all()), repeat),
+                query_plan(queryset),
+            )
+            for name, queryset in querysets.items()
+        }
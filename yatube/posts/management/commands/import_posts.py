@@ -0,0 +1,157 @@
+import csv
+import gzip
+import itertools
+import json
+import sys
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.bulk import IdMap, explicit_pub_date, refresh_derived_data
+from posts.models import Group, Post, User
+
+
+def open_source(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def read_rows(source, file_format):
+    """Строки файла по одной, без чтения файла целиком."""
+    if file_format == 'csv':
+        csv.field_size_limit(2 ** 31 - 1)
+        yield from csv.DictReader(source)
+        return
+    for line in source:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            # Испорченная строка пропускается вместе с прочими неверными.
+            yield None
+
+
+def parse_pub_date(value):
+    if not value:
+        return timezone.now()
+    pub_date = parse_datetime(value)
+    if pub_date is None:
+        raise ValueError(f'неверная дата {value!r}')
+    if timezone.is_naive(pub_date):
+        pub_date = timezone.make_aware(pub_date)
+    return pub_date
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSONL или CSV (поля text, author, group, '
+        'group_title, pub_date) пачками через bulk_create. Авторы и группы, '
+        'которых нет в базе, создаются. После загрузки пересчитываются '
+        'счётчики, поисковый индекс и ленты подписок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл, .gz или - для stdin.')
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--transaction-size', type=int, default=100000,
+                            help='Строк в одной транзакции.')
+
+    def handle(self, path, format, batch_size, transaction_size, **options):
+        name = path[:-len('.gz')] if path.endswith('.gz') else path
+        file_format = format or ('csv' if name.endswith('.csv') else 'jsonl')
+        self.authors = IdMap(
+            User, 'username',
+            lambda username: User(
+                username=username, password=make_password(None)
+            ),
+        )
+        self.groups = IdMap(
+            Group, 'slug',
+            lambda slug, title: Group(slug=slug, title=title, description=''),
+        )
+        self.skipped = 0
+        last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        started = time.perf_counter()
+        read = 0
+        try:
+            with open_source(path) as source:
+                rows = read_rows(source, file_format)
+                batches_per_transaction = max(
+                    transaction_size // batch_size, 1
+                )
+                while True:
+                    with transaction.atomic(), explicit_pub_date():
+                        done = sum(
+                            self.import_batch(batch)
+                            for batch in itertools.islice(
+                                self.batches(rows, batch_size),
+                                batches_per_transaction,
+                            )
+                        )
+                    if not done:
+                        break
+                    read += done
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(
+                        f'Прочитано строк: {read} ({read / elapsed:.0f} в с)'
+                    )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        finally:
+            # Пачки до ошибки уже зафиксированы, и счётчики, индекс
+            # и ленты нужны им так же, как при полной загрузке.
+            refresh_derived_data(
+                last_id, self.groups.ids, self.authors.ids, self.stdout
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов: {read - self.skipped}, пропущено строк: '
+            f'{self.skipped}, новых авторов: {self.authors.created}, '
+            f'новых групп: {self.groups.created}, '
+            f'{read / elapsed:.0f} строк/с'
+        ))
+
+    def batches(self, rows, batch_size):
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def import_batch(self, rows):
+        posts = []
+        for row in rows:
+            try:
+                if not row.get('text') or not row.get('author'):
+                    raise ValueError('нет text или author')
+                posts.append((
+                    row['author'],
+                    row.get('group') or None,
+                    row.get('group_title') or row.get('group'),
+                    Post(
+                        text=row['text'],
+                        pub_date=parse_pub_date(row.get('pub_date')),
+                    ),
+                ))
+            except (AttributeError, ValueError) as error:
+                self.skipped += 1
+                self.stderr.write(f'Строка пропущена: {error}')
+        self.authors.resolve({author: {} for author, _, _, _ in posts})
+        self.groups.resolve({
+            slug: {'title': title} for _, slug, title, _ in posts if slug
+        })
+        for author, slug, _, post in posts:
+            post.author_id = self.authors[author]
+            post.group_id = self.groups[slug] if slug else None
+        Post.objects.bulk_create(post for _, _, _, post in posts)
+        return len(rows)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import AuthorStats, Follow, Post
+
+
+def counts_by_author(queryset):
+    return dict(
+        queryset.order_by().values_list('author').annotate(Count('id'))
+    )
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает статистику постов и подписчиков авторов '
+            'по таблицам постов и подписок.')
+
+    def handle(self, *args, **options):
+        posts = counts_by_author(Post.objects.all())
+        followers = counts_by_author(Follow.objects.all())
+        fixed = 0
+        with transaction.atomic():
+            for stats in AuthorStats.objects.select_for_update():
+                actual = (
+                    posts.pop(stats.author_id, 0),
+                    followers.pop(stats.author_id, 0),
+                )
+                current = (stats.posts_count, stats.followers_count)
+                if current != actual:
+                    self.stdout.write(
+                        f'{stats.author_id}: {current} -> {actual}'
+                    )
+                    stats.posts_count, stats.followers_count = actual
+                    stats.save(
+                        update_fields=['posts_count', 'followers_count']
+                    )
+                    fixed += 1
+            missing = posts.keys() | followers.keys()
+            AuthorStats.objects.bulk_create(
+                AuthorStats(
+                    author_id=author_id,
+                    posts_count=posts.get(author_id, 0),
+                    followers_count=followers.get(author_id, 0),
+                )
+                for author_id in missing
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено: {fixed}, создано: {len(missing)}'
+        ))
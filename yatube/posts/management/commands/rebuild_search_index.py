@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает поисковый индекс постов. Нужен после загрузки '
+            'постов в обход сигналов, например через bulk_create.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Проиндексировано: {indexed}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.timeline import rebuild_timelines
+
+
+class Command(BaseCommand):
+    help = ('Перестраивает ленты подписок. Нужен после загрузки подписок '
+            'или постов в обход сигналов.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            entries = rebuild_timelines()
+        self.stdout.write(self.style.SUCCESS(f'Записей в лентах: {entries}'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.counters import actual_counts
+from posts.models import PostCount
+
+STALE_BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет счётчики постов с таблицей постов и исправляет '
+        'расхождения. Предназначена для периодического запуска.'
+    )
+
+    def handle(self, *args, **options):
+        counts = actual_counts()
+        fixed = 0
+        with transaction.atomic():
+            stored = {
+                counter.scope: counter
+                for counter in PostCount.objects.select_for_update()
+            }
+            stale = sorted(set(stored) - set(counts))
+            for start in range(0, len(stale), STALE_BATCH_SIZE):
+                PostCount.objects.filter(
+                    scope__in=stale[start:start + STALE_BATCH_SIZE]
+                ).delete()
+            PostCount.objects.bulk_create(
+                PostCount(scope=scope, count=count)
+                for scope, count in counts.items() if scope not in stored
+            )
+            for scope, count in counts.items():
+                counter = stored.get(scope)
+                if counter is not None and counter.count != count:
+                    self.stdout.write(
+                        f'{scope}: {counter.count} -> {count}'
+                    )
+                    counter.count = count
+                    counter.save(update_fields=['count'])
+                    fixed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчиков: {len(counts)}, исправлено: {fixed}, '
+            f'удалено: {len(stale)}'
+        ))
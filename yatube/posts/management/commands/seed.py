@@ -0,0 +1,223 @@
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from faker import Faker
+
+from posts.bulk import IdMap, explicit_pub_date, refresh_derived_data
+from posts.models import Group, Post, User
+
+# Доля постов по часам суток: ночью пишут мало, пик вечером.
+HOURLY_ACTIVITY = (
+    2, 1, 1, 1, 1, 2, 3, 5, 7, 8, 8, 8,
+    9, 9, 8, 8, 8, 9, 10, 11, 12, 11, 8, 5,
+)
+WEEKEND_ACTIVITY = 0.7
+BURST_CHANCE = 0.03
+VOCABULARY_SIZE = 500
+
+
+def zipf_weights(count, skew):
+    """Накопленные веса закона Ципфа: k-й по популярности элемент
+    выбирается с вероятностью, пропорциональной 1 / k ** skew."""
+    return list(itertools.accumulate(
+        1 / rank ** skew for rank in range(1, count + 1)
+    ))
+
+
+def distribute(total, weights):
+    """Раскладывает total по весам целыми числами с суммой total
+    (метод наибольших остатков)."""
+    scale = total / sum(weights)
+    shares = [weight * scale for weight in weights]
+    counts = [int(share) for share in shares]
+    by_remainder = sorted(
+        range(len(shares)), key=lambda day: counts[day] - shares[day]
+    )
+    for day in by_remainder[:total - sum(counts)]:
+        counts[day] += 1
+    return counts
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу правдоподобными данными: авторы и группы выбираются '
+        'по закону Ципфа, посты идут всплесками с суточным ритмом, длина '
+        'текста распределена с длинным хвостом. Результат полностью '
+        'определяется --seed и остальными параметрами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--authors', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--author-skew', type=float, default=1.1,
+                            help='Показатель закона Ципфа для авторов.')
+        parser.add_argument('--group-skew', type=float, default=1.0,
+                            help='Показатель закона Ципфа для групп.')
+        parser.add_argument('--ungrouped', type=float, default=0.3,
+                            help='Доля постов без группы.')
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--end',
+                            help='Последний день (ГГГГ-ММ-ДД), по умолчанию '
+                                 'сегодня.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--transaction-size', type=int, default=100000,
+                            help='Постов в одной транзакции.')
+
+    def handle(self, *args, **options):
+        if options['posts'] < 0 or options['authors'] < 1 \
+                or options['groups'] < 1 or options['days'] < 1:
+            raise CommandError('Нужны посты, авторы, группы и дни.')
+        end = timezone.localdate()
+        if options['end']:
+            end = parse_date(options['end'])
+            if end is None:
+                raise CommandError(f'Неверная дата {options["end"]!r}')
+        options['end'] = timezone.make_aware(datetime.combine(
+            end, datetime.min.time()
+        ))
+        self.rng = random.Random(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(options['seed'])
+        self.vocabulary = self.fake.words(VOCABULARY_SIZE, unique=True)
+        self.word_weights = zipf_weights(len(self.vocabulary), 1.0)
+        authors = self.seed_authors(options['authors'])
+        groups = self.seed_groups(options['groups'])
+        last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        started = time.perf_counter()
+        posts = self.generate_posts(authors, groups, options)
+        batches_per_transaction = max(
+            options['transaction_size'] // options['batch_size'], 1
+        )
+        created = 0
+        while True:
+            with transaction.atomic(), explicit_pub_date():
+                done = 0
+                for _ in range(batches_per_transaction):
+                    batch = list(itertools.islice(
+                        posts, options['batch_size']
+                    ))
+                    if not batch:
+                        break
+                    Post.objects.bulk_create(batch)
+                    done += len(batch)
+            if not done:
+                break
+            created += done
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'Постов: {created} ({created / elapsed:.0f} в с)'
+            )
+        refresh_derived_data(
+            last_id, self.groups.ids, self.authors.ids, self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Постов: {created}, новых авторов: {self.authors.created}, '
+            f'новых групп: {self.groups.created}'
+        ))
+
+    def seed_authors(self, count):
+        """id авторов в порядке убывания популярности."""
+        names = {}
+        for number in range(count):
+            username = f'{self.fake.user_name()}{number}'
+            names[username] = {
+                'first_name': self.fake.first_name(),
+                'last_name': self.fake.last_name(),
+            }
+        self.authors = IdMap(
+            User, 'username',
+            lambda username, **fields: User(
+                username=username, password=make_password(None), **fields
+            ),
+        )
+        self.authors.resolve(names)
+        return [self.authors[username] for username in names]
+
+    def seed_groups(self, count):
+        titles = {}
+        for number in range(count):
+            title = self.fake.words(2, unique=True)
+            titles[f'seed-group-{number}'] = {
+                'title': ' '.join(title).capitalize(),
+            }
+        self.groups = IdMap(
+            Group, 'slug',
+            lambda slug, title: Group(slug=slug, title=title, description=''),
+        )
+        self.groups.resolve(titles)
+        return [self.groups[slug] for slug in titles]
+
+    def day_weights(self, days, end):
+        """Активность по дням: рост аудитории, спад в выходные
+        и редкие всплески в несколько раз выше обычного."""
+        weights = []
+        for offset in range(days):
+            day = end - timedelta(days=days - 1 - offset)
+            weight = (0.5 + 0.5 * offset / days) * self.rng.lognormvariate(
+                0, 0.4
+            )
+            if day.weekday() >= 5:
+                weight *= WEEKEND_ACTIVITY
+            if self.rng.random() < BURST_CHANCE:
+                weight *= self.rng.uniform(3, 10)
+            weights.append(weight)
+        return weights
+
+    def text(self):
+        """Длина текста логнормальная: в основном короткие посты
+        и немного очень длинных."""
+        length = min(max(int(self.rng.lognormvariate(2.7, 1.0)), 1), 2000)
+        words = self.rng.choices(
+            self.vocabulary, cum_weights=self.word_weights, k=length
+        )
+        sentences = []
+        while words:
+            size = self.rng.randint(4, 14)
+            sentence, words = words[:size], words[size:]
+            sentences.append(' '.join(sentence).capitalize() + '.')
+        return ' '.join(sentences)
+
+    def generate_posts(self, authors, groups, options):
+        """Посты в порядке pub_date, чтобы id росли вместе с датой."""
+        end = options['end']
+        days = options['days']
+        author_weights = zipf_weights(len(authors), options['author_skew'])
+        group_weights = zipf_weights(len(groups), options['group_skew'])
+        hours = list(range(24))
+        hour_weights = list(itertools.accumulate(HOURLY_ACTIVITY))
+        counts = distribute(options['posts'], self.day_weights(days, end))
+        for offset, count in enumerate(counts):
+            day = end - timedelta(days=days - 1 - offset)
+            moments = sorted(
+                hour * 3600 + self.rng.random() * 3600
+                for hour in self.rng.choices(
+                    hours, cum_weights=hour_weights, k=count
+                )
+            )
+            post_authors = self.rng.choices(
+                authors, cum_weights=author_weights, k=count
+            )
+            post_groups = self.rng.choices(
+                groups, cum_weights=group_weights, k=count
+            )
+            for moment, author_id, group_id in zip(
+                moments, post_authors, post_groups
+            ):
+                if self.rng.random() < options['ungrouped']:
+                    group_id = None
+                yield Post(
+                    text=self.text(),
+                    pub_date=day + timedelta(seconds=moment),
+                    author_id=author_id,
+                    group_id=group_id,
+                )
@@ -0,0 +1,112 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.benchmarks import query_plan, seed_posts, timed, uses_sort_step
+from posts.models import Follow, Post, User
+from posts.timeline import fan_out_posts, follow_feed, rebuild_timelines
+from posts.utils import POSTS_PER_PAGE, CursorPaginator
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает ленту подписок из разложенных при публикации записей '
+        '(fan-out on write) с выборкой постов подписок при чтении '
+        '(fan-out on read). Данные создаются во временной транзакции '
+        'и откатываются после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument(
+            '--follows', type=int, nargs='+', default=[1, 10, 100, 500],
+            help='Число подписок у читателей, по читателю на значение.',
+        )
+        parser.add_argument('--followers', type=int, default=10000,
+                            help='Подписчиков у автора при замере записи.')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, posts, authors, follows, followers, repeat, **options):
+        self.stdout.write(f'Создание {posts} постов...')
+        authors, _ = seed_posts(posts, authors=authors)
+        readers = self.seed_readers(authors, follows, followers)
+        self.stdout.write(f'Записей в лентах: {rebuild_timelines()}')
+        for reader, count in zip(readers, follows):
+            feed, entries = follow_feed(reader)
+            strategies = {
+                'fan-out on write': feed,
+                'fan-out on read': Post.objects.filter(
+                    author__in=reader.follower.values('author')
+                ),
+            }
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'читатель с {count} подписками, {entries} постов в ленте'
+            ))
+            for name, queryset in strategies.items():
+                paginator = CursorPaginator(queryset, POSTS_PER_PAGE)
+                first = paginator.object_list[:POSTS_PER_PAGE + 1]
+                # Середина ленты, куда читатель дошёл по курсору.
+                middle = paginator.object_list[entries // 2:].first()
+                deep = paginator.cursor_queryset(
+                    (middle.pub_date, middle.pk)
+                )[:POSTS_PER_PAGE + 1]
+                step = 'обход индекса'
+                if uses_sort_step(query_plan(first)):
+                    step = 'сортировка'
+                self.stdout.write(
+                    f'  {name}: первая страница '
+                    f'{timed(lambda: list(first.all()), repeat):.2f} мс, '
+                    f'середина ленты '
+                    f'{timed(lambda: list(deep.all()), repeat):.2f} мс, '
+                    f'{step}'
+                )
+
+        author = authors[0]
+        new_posts = iter(Post.objects.bulk_create(
+            Post(text='Новый пост', author=author) for _ in range(repeat)
+        ))
+        elapsed = timed(
+            lambda: fan_out_posts([{'post_id': next(new_posts).pk}]), repeat
+        )
+        self.stdout.write(self.style.MIGRATE_HEADING('публикация'))
+        self.stdout.write(
+            f'  fan-out on write: {elapsed:.2f} мс на раскладку поста '
+            f'{author.following.count()} подписчикам'
+        )
+        self.stdout.write('  fan-out on read: запись не нужна')
+
+    def seed_readers(self, authors, follows, followers):
+        """Читатели с заданным числом подписок и подписчики первого
+        автора, на котором меряется раскладка поста."""
+        User.objects.bulk_create(
+            User(username=f'bench-reader-{i}')
+            for i in range(len(follows) + followers)
+        )
+        readers = list(
+            User.objects.filter(username__startswith='bench-reader-')
+        )
+        rng = random.Random(0)
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=author)
+            for reader, count in zip(readers, follows)
+            for author in rng.sample(authors[1:], count)
+        )
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=authors[0])
+            for reader in readers[len(follows):]
+        )
+        return readers[:len(follows)]
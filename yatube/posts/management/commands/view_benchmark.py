@@ -0,0 +1,137 @@
+import json
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.benchmarks import seed_posts, view_timing
+from posts.utils import POSTS_PER_PAGE, encode_cursor
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Меряет публичные страницы на базе заданного размера: перцентили '
+        'времени ответа, число SQL-запросов и пик памяти на запрос. '
+        'Результат сохраняется в JSON и сравнивается с прошлым запуском. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--authors', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=100,
+                            help='Запросов к каждой странице.')
+        parser.add_argument('--output', help='Куда сохранить JSON.')
+        parser.add_argument('--baseline',
+                            help='JSON прошлого запуска для сравнения.')
+        parser.add_argument(
+            '--max-regression', type=float, default=20,
+            help='Допустимый рост p95 в процентах относительно baseline.',
+        )
+
+    def handle(self, *args, output, baseline, max_regression, **options):
+        try:
+            # Замер идёт в режиме продакшена: без журнала запросов DEBUG
+            # и без проверки query_budget на каждом запросе.
+            with transaction.atomic(), override_settings(
+                DEBUG=False, QUERY_BUDGET_ENFORCE=False,
+                ALLOWED_HOSTS=['testserver'],
+            ):
+                report = self.run(**options)
+                raise Rollback
+        except Rollback:
+            pass
+        if output:
+            with open(output, 'w', encoding='utf-8') as target:
+                json.dump(report, target, ensure_ascii=False, indent=2)
+        if baseline:
+            with open(baseline, encoding='utf-8') as source:
+                self.compare(json.load(source)['results'], report['results'],
+                             max_regression)
+
+    def run(self, posts, authors, groups, requests, **options):
+        self.stdout.write(f'Создание {posts} постов...')
+        authors, groups = seed_posts(posts, authors=authors, groups=groups)
+        call_command('reconcile_post_counts', stdout=self.stdout)
+        call_command('rebuild_author_stats', stdout=self.stdout)
+        author, group = authors[0], groups[0]
+        client = Client()
+        client.force_login(author)
+        results = {}
+        for name, (method, url, data) in self.scenarios(author, group):
+            stats = view_timing(client, method, url, data, requests)
+            if stats['status'] >= 400:
+                raise CommandError(f'{name}: ответ {stats["status"]}')
+            results[name] = {'url': url, **stats}
+            self.stdout.write(
+                f'{name}: p50 {stats["p50_ms"]:.2f} мс, '
+                f'p95 {stats["p95_ms"]:.2f} мс, '
+                f'p99 {stats["p99_ms"]:.2f} мс, '
+                f'{stats["queries"]} запросов, '
+                f'{stats["peak_memory_kb"]:.0f} КиБ'
+            )
+        return {
+            'settings': {
+                'posts': posts, 'authors': len(authors),
+                'groups': len(groups), 'requests': requests,
+            },
+            'results': results,
+        }
+
+    def scenarios(self, author, group):
+        group_url = reverse('posts:group_list', kwargs={'slug': group.slug})
+        posts = group.posts.order_by('-pub_date', '-id')
+        middle = posts.count() // 2
+        deep_post = posts[middle:middle + 1].get()
+        post = author.posts.order_by('-pub_date', '-id').first()
+        form = {'text': 'Пост из замера', 'group': group.pk}
+        return (
+            ('index', ('get', reverse('posts:index'), None)),
+            ('group_posts', ('get', group_url, None)),
+            ('group_posts deep page', (
+                'get', group_url, {'page': middle // POSTS_PER_PAGE + 1},
+            )),
+            ('group_posts deep cursor', (
+                'get', group_url,
+                {'after': encode_cursor(deep_post.pub_date, deep_post.pk)},
+            )),
+            ('group_posts load more', (
+                'get',
+                reverse('posts:group_list_more', kwargs={'slug': group.slug}),
+                {'after': encode_cursor(deep_post.pub_date, deep_post.pk)},
+            )),
+            ('profile', ('get', reverse(
+                'posts:profile', kwargs={'username': author.username}
+            ), None)),
+            ('post_detail', ('get', reverse(
+                'posts:post_detail', kwargs={'post_id': post.pk}
+            ), None)),
+            ('post_create', ('post', reverse('posts:post_create'), form)),
+            ('post_edit', ('post', reverse(
+                'posts:post_edit', kwargs={'post_id': post.pk}
+            ), form)),
+        )
+
+    def compare(self, baseline, results, max_regression):
+        self.stdout.write(self.style.MIGRATE_HEADING('сравнение с baseline'))
+        regressions = []
+        for name, stats in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            change = (stats['p95_ms'] / before['p95_ms'] - 1) * 100
+            queries = stats['queries'] - before['queries']
+            self.stdout.write(
+                f'{name}: p95 {change:+.0f}%, запросов {queries:+d}'
+            )
+            if change > max_regression or queries > 0:
+                regressions.append(name)
+        if regressions:
+            raise CommandError(f'Регрессии: {", ".join(regressions)}')
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-17 20:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_delete_postform'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_modification_stamps'),
+    ]
+
+    # Индекс хранит копию текста и не завязан на триггеры: SQLite
+    # пересоздаёт posts_post при изменении схемы, и триггеры бы терялись.
+    # Индекс обновляют сигналы, а после массовой загрузки —
+    # команда rebuild_search_index.
+    operations = [
+        migrations.RunSQL(
+            "CREATE VIRTUAL TABLE posts_post_search USING fts5("
+            "text, tokenize = 'unicode61 remove_diacritics 2')",
+            'DROP TABLE posts_post_search',
+        ),
+        migrations.RunSQL(
+            'INSERT INTO posts_post_search (rowid, text) '
+            "SELECT id, replace(replace(text, 'ё', 'е'), 'Ё', 'Е') "
+            'FROM posts_post',
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-17 22:25
+
+from django.db import migrations, models
+import posts.models
+
+
+def fill_title_lower(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    groups = list(Group.objects.only('title'))
+    for group in groups:
+        group.title_lower = group.title.lower()
+    Group.objects.bulk_update(groups, ['title_lower'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_group_title_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='title_lower',
+            field=posts.models.LowercaseField(default='', editable=False, max_length=200, source='title'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_title_lower, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['title_lower'], name='group_title_lower_idx'),
+        ),
+    ]
@@ -7,11 +7,45 @@ User = get_user_model()
 CUT_POST_LENGTH = 15
 
 
+class LowercaseField(models.CharField):
+    """Копия поля source в нижнем регистре.
+
+    Заполняется при каждой записи модели, в том числе через bulk_create.
+    """
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+        kwargs.setdefault('editable', False)
+        super().__init__(**kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        return name, path, args, kwargs
+
+    def pre_save(self, model_instance, add):
+        value = getattr(model_instance, self.source).lower()
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
+    # Для поиска по префиксу названия без учёта регистра: встроенный
+    # lower() SQLite не меняет регистр кириллицы.
+    title_lower = LowercaseField('title', max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
 
+    class Meta:
+        # Список групп по названию и поиск по префиксу, см. group_choices.
+        indexes = [
+            models.Index(fields=['title'], name='group_title_idx'),
+            models.Index(
+                fields=['title_lower'], name='group_title_lower_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -19,6 +53,7 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField()
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -31,9 +66,121 @@ class Post(models.Model):
         on_delete=models.SET_NULL,
         related_name='posts'
     )
+    # Уменьшенные копии готовятся заранее, см. PostThumbnail.
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_feed_idx'),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_feed_idx',
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_feed_idx',
+            ),
+            models.Index(fields=['updated'], name='post_updated_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
+
+
+class PostThumbnail(models.Model):
+    """Готовая уменьшенная копия картинки поста для srcset."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='thumbnails'
+    )
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    url = models.CharField(max_length=255)
+
+    class Meta:
+        ordering = ['width']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'width'], name='unique_post_thumbnail'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.width}w'
+
+
+class PostCount(models.Model):
+    scope = models.CharField(max_length=64, unique=True)
+    count = models.PositiveIntegerField(default=0)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.scope}: {self.count}'
+
+
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='post_stats'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    # Посты авторов с большим числом подписчиков не раскладываются
+    # по лентам, а подмешиваются при чтении. Флаг не снимается, иначе
+    # из лент пропали бы посты, написанные, пока он стоял.
+    fan_out_on_read = models.BooleanField(default=False)
+    modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'], name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, разложенный при публикации."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_timeline_entry'
+            ),
+        ]
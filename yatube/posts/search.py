@@ -0,0 +1,104 @@
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from core.tasks import task
+from .models import Post
+
+SEARCH_TABLE = 'posts_post_search'
+MAX_TERMS = 10
+# normalize на SQL, для индексации запросом INSERT ... SELECT
+NORMALIZED_TEXT = "replace(replace(text, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def normalize(text):
+    """Токенизатор FTS5 не сводит «ё» к «е», делаем это сами."""
+    return text.replace('ё', 'е').replace('Ё', 'Е')
+
+
+def match_expression(query):
+    """Переводит запрос пользователя в выражение MATCH для FTS5.
+
+    Каждое слово ищется как префикс, слова объединяются через AND.
+    Пустая строка означает, что искать нечего.
+    """
+    terms = re.findall(r'\w+', normalize(query).lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+@task('posts.index_posts', batch=True)
+def index_posts(payloads):
+    """Переиндексирует посты пачкой, удалённые убираются из индекса.
+
+    Текст берётся из таблицы постов, поэтому несколько правок поста
+    в одной пачке дают одну запись индекса с последним текстом.
+    INSERT OR REPLACE заменяет прежнюю запись поста: повторное
+    выполнение задачи после потери аренды ничего не ломает.
+    """
+    post_ids = list({payload['post_id'] for payload in payloads})
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        if not all(payload.get('created') for payload in payloads):
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} '
+                f'WHERE rowid IN ({placeholders}) AND rowid NOT IN ('
+                f'SELECT id FROM {Post._meta.db_table} '
+                f'WHERE id IN ({placeholders}))',
+                post_ids * 2,
+            )
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, text) '
+            f'SELECT id, {NORMALIZED_TEXT} FROM {Post._meta.db_table} '
+            f'WHERE id IN ({placeholders})',
+            post_ids,
+        )
+
+
+def index_posts_after(post_id=0):
+    """Индексирует одним запросом ещё не проиндексированные посты
+    с id больше post_id, например загруженные через bulk_create."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, text) '
+            f'SELECT id, {NORMALIZED_TEXT} FROM {Post._meta.db_table} '
+            'WHERE id > %s AND id NOT IN ('
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE rowid > %s)',
+            [post_id, post_id],
+        )
+        return cursor.rowcount
+
+
+def rebuild_index():
+    """Заполняет индекс заново по таблице постов одним запросом."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    return index_posts_after()
+
+
+def matching_ids(expression):
+    """Подзапрос с id постов, подходящих под выражение."""
+    return RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        [expression],
+    )
+
+
+def search_posts(query, queryset=None):
+    """Посты по запросу, от самых релевантных (ранжирование BM25)."""
+    if queryset is None:
+        queryset = Post.objects.all()
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    table = Post._meta.db_table
+    return queryset.extra(
+        select={'rank': f'{SEARCH_TABLE}.rank'},
+        tables=[SEARCH_TABLE],
+        where=[
+            f'{SEARCH_TABLE}.rowid = {table}.id',
+            f'{SEARCH_TABLE} MATCH %s',
+        ],
+        params=[expression],
+        order_by=['rank', '-pub_date'],
+    )
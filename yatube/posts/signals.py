@@ -0,0 +1,158 @@
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete,
+)
+from django.dispatch import receiver
+
+from core.tasks import enqueue
+
+from . import counters, feed_cache, group_choices, timeline
+from .models import Follow, Group, Post, User
+
+
+def remember_scopes(post):
+    """Запоминает группу и автора, с которыми пост был загружен."""
+    values = post.__dict__
+    post._loaded_scopes = (values.get('group_id'), values.get('author_id'))
+    post._loaded_text = values.get('text')
+    post._loaded_image = image_name(values.get('image'))
+
+
+def image_name(image):
+    return getattr(image, 'name', image) or ''
+
+
+def group_slug(group_id):
+    return Group.objects.filter(pk=group_id).values_list(
+        'slug', flat=True
+    ).first()
+
+
+def related_value(post, name, field):
+    """Поле группы или автора поста.
+
+    Берётся из загруженного объекта, а если его нет — запросом одного
+    поля по id: при каскадном удалении объекты постов не загружены,
+    и обращение к post.author грузило бы строку на каждый пост.
+    """
+    related_id = getattr(post, f'{name}_id')
+    if related_id is None:
+        return None
+    descriptor = getattr(Post, name)
+    if descriptor.is_cached(post):
+        related = getattr(post, name)
+        if related is not None and related.pk == related_id:
+            return getattr(related, field)
+    return descriptor.field.related_model.objects.filter(
+        pk=related_id
+    ).values_list(field, flat=True).first()
+
+
+def author_scopes(group):
+    """Профили авторов группы: в их лентах выводится группа поста."""
+    return {
+        feed_cache.profile_scope(username)
+        for username in User.objects.filter(
+            posts__group=group
+        ).distinct().values_list('username', flat=True)
+    }
+
+
+def invalidate_post_feeds(post):
+    """Сбрасывает кэш лент, на которых пост был или стал виден."""
+    scopes = feed_cache.post_feed_scopes(
+        related_value(post, 'group', 'slug'),
+        related_value(post, 'author', 'username'),
+    )
+    old_group_id = post._loaded_scopes[0]
+    if old_group_id not in (None, post.group_id):
+        scopes.add(feed_cache.group_list_scope(group_slug(old_group_id)))
+    feed_cache.invalidate_after_write(scopes)
+
+
+@receiver(post_init, sender=Post)
+def post_loaded(sender, instance, **kwargs):
+    remember_scopes(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    new_scopes = counters.post_scopes(instance.group_id)
+    if created:
+        counters.change_count(new_scopes, 1)
+        counters.change_author_count(instance.author_id, 1)
+        enqueue('posts.fan_out', post_id=instance.pk)
+    elif instance._loaded_scopes[1] is not None:
+        old_group_id, old_author_id = instance._loaded_scopes
+        old_scopes = counters.post_scopes(old_group_id)
+        counters.change_count(old_scopes - new_scopes, -1)
+        counters.change_count(new_scopes - old_scopes, 1)
+        counters.change_count(old_scopes & new_scopes)
+        if old_author_id != instance.author_id:
+            counters.change_author_count(old_author_id, -1)
+            counters.change_author_count(instance.author_id, 1)
+        else:
+            counters.change_author_count(instance.author_id)
+    if created or instance.text != instance._loaded_text:
+        enqueue('posts.index_posts', post_id=instance.pk, created=created)
+    if image_name(instance.image) != instance._loaded_image:
+        enqueue('posts.make_thumbnails', post_id=instance.pk)
+    invalidate_post_feeds(instance)
+    remember_scopes(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.change_count(counters.post_scopes(instance.group_id), -1)
+    counters.change_author_count(instance.author_id, -1)
+    enqueue('posts.index_posts', post_id=instance.pk)
+    invalidate_post_feeds(instance)
+
+
+@receiver(post_init, sender=Group)
+def group_loaded(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    counters.change_count(
+        {counters.GLOBAL_SCOPE, counters.group_scope(instance.pk)}
+    )
+    counters.touch_group_authors(instance.pk)
+    feed_cache.invalidate_after_write({
+        feed_cache.INDEX_SCOPE,
+        feed_cache.group_list_scope(instance.slug),
+        feed_cache.group_list_scope(instance._loaded_slug),
+        group_choices.CHOICES_SCOPE,
+        *author_scopes(instance),
+    })
+    instance._loaded_slug = instance.slug
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    # После удаления посты уже отвязаны от группы, и авторов не найти.
+    counters.touch_group_authors(instance.pk)
+    feed_cache.invalidate_after_write(author_scopes(instance))
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    counters.drop_scope(counters.group_scope(instance.pk))
+    counters.change_count({counters.GLOBAL_SCOPE})
+    feed_cache.invalidate_after_write({
+        feed_cache.INDEX_SCOPE,
+        feed_cache.group_list_scope(instance.slug),
+        group_choices.CHOICES_SCOPE,
+    })
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        timeline.followed(instance)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    timeline.unfollowed(instance)
@@ -0,0 +1,86 @@
+import datetime
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.utils import formats, timezone
+from django.utils.text import capfirst
+from django.utils.translation import gettext as _
+
+register = template.Library()
+
+
+def date_bounds(queryset, field_name):
+    """Первая и последняя дата выборки.
+
+    Два запроса с ORDER BY ... LIMIT 1 берут края индекса по дате,
+    а MIN и MAX в одном запросе SQLite считает обходом всей таблицы.
+    """
+    values = queryset.values_list(field_name, flat=True)
+    first = values.order_by(field_name).first()
+    if first is None:
+        return None
+    last = values.order_by(f'-{field_name}').first()
+    return timezone.localtime(first).date(), timezone.localtime(last).date()
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def post_date_hierarchy(cl):
+    """date_hierarchy без DISTINCT-запросов по всей таблице.
+
+    Годы, месяцы и дни перечисляются по диапазону дат выборки,
+    поэтому среди них могут попасться периоды без постов.
+    """
+    field_name = cl.date_hierarchy
+    year_field = f'{field_name}__year'
+    month_field = f'{field_name}__month'
+    day_field = f'{field_name}__day'
+    year = cl.params.get(year_field)
+    month = cl.params.get(month_field)
+    if year and month and cl.params.get(day_field):
+        return date_hierarchy(cl)
+
+    def link(filters):
+        return cl.get_query_string(filters, [f'{field_name}__'])
+
+    bounds = date_bounds(cl.queryset, field_name)
+    if bounds is None:
+        return {'show': False}
+    first, last = bounds
+    if not year and first.year == last.year:
+        year = first.year
+        if first.month == last.month:
+            month = first.month
+    if year and month:
+        year, month = int(year), int(month)
+        return {
+            'show': True,
+            'back': {'link': link({year_field: year}), 'title': str(year)},
+            'choices': [{
+                'link': link({
+                    year_field: year, month_field: month, day_field: day,
+                }),
+                'title': capfirst(formats.date_format(
+                    datetime.date(year, month, day), 'MONTH_DAY_FORMAT'
+                )),
+            } for day in range(first.day, last.day + 1)],
+        }
+    if year:
+        year = int(year)
+        return {
+            'show': True,
+            'back': {'link': link({}), 'title': _('All dates')},
+            'choices': [{
+                'link': link({year_field: year, month_field: month}),
+                'title': capfirst(formats.date_format(
+                    datetime.date(year, month, 1), 'YEAR_MONTH_FORMAT'
+                )),
+            } for month in range(first.month, last.month + 1)],
+        }
+    return {
+        'show': True,
+        'back': None,
+        'choices': [
+            {'link': link({year_field: str(year)}), 'title': str(year)}
+            for year in range(first.year, last.year + 1)
+        ],
+    }
@@ -0,0 +1,56 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.timezone import get_current_timezone_name
+from django.utils.translation import get_language
+
+from ..thumbnails import attach_thumbnails
+
+register = template.Library()
+
+CARD_TEMPLATE = 'posts/includes/post_card.html'
+# Увеличивается при изменении разметки карточки.
+CARD_VERSION = 2
+
+
+def card_key(post):
+    """Ключ карточки меняется вместе с постом, его группой и автором,
+    поэтому сбрасывать кэш карточек при записи не нужно."""
+    group = post.group
+    author = post.author
+    version = '\n'.join(map(str, (
+        CARD_VERSION, post.updated.timestamp(),
+        group and group.slug, group and group.title,
+        author.username, author.get_full_name(),
+        get_language(), get_current_timezone_name(),
+    )))
+    digest = hashlib.md5(version.encode()).hexdigest()
+    return f'post-card:{post.pk}:{digest}'
+
+
+@register.simple_tag
+def post_cards(posts):
+    """HTML карточек постов страницы: {% post_cards page_obj as cards %}.
+
+    Готовые карточки берутся из кэша одним запросом, рендерятся
+    только недостающие.
+    """
+    posts = list(posts)
+    keys = [card_key(post) for post in posts]
+    cards = cache.get_many(keys)
+    to_render = {
+        key: post for key, post in zip(keys, posts) if key not in cards
+    }
+    attach_thumbnails(list(to_render.values()))
+    missing = {
+        key: render_to_string(CARD_TEMPLATE, {'post': post})
+        for key, post in to_render.items()
+    }
+    if missing:
+        cache.set_many(missing, settings.POST_CARD_TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Группа, которой нет в списке',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        for i in range(3):
+            Post.objects.create(
+                text=f'Тестовый текст {i}', author=cls.admin, group=cls.group
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:posts_post_changelist')
+
+    def test_changelist_without_table_count(self):
+        """Список постов не считает всю таблицу постов."""
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['cl'].result_count, 3)
+        for query in queries:
+            self.assertNotIn('COUNT(*) AS "__count" FROM "posts_post"',
+                             query['sql'])
+
+    def test_group_editing_without_full_select(self):
+        """Группа правится через автодополнение, а не списком всех групп."""
+        response = self.client.get(self.url)
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertNotContains(response, self.other_group.title)
+
+    def test_date_hierarchy(self):
+        """Навигация по датам строится по краям диапазона дат."""
+        post = Post.objects.latest('pub_date')
+        response = self.client.get(self.url)
+        self.assertContains(response, 'date-back')
+        response = self.client.get(self.url, {
+            'pub_date__year': post.pub_date.year,
+            'pub_date__month': post.pub_date.month,
+            'pub_date__day': post.pub_date.day,
+        })
+        self.assertEqual(response.context['cl'].result_count, 3)
@@ -0,0 +1,116 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..counters import GLOBAL_SCOPE, get_count, group_scope, reconcile
+from ..models import AuthorStats, Group, Post, PostCount, User
+
+
+class PostCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        cls.scopes = (
+            GLOBAL_SCOPE,
+            group_scope(cls.group.pk),
+            group_scope(cls.other_group.pk),
+        )
+
+    def setUp(self):
+        cache.clear()
+        for scope in self.scopes:
+            reconcile(scope)
+
+    def assertCountsActual(self):
+        for scope in self.scopes:
+            with self.subTest(scope=scope):
+                self.assertEqual(
+                    PostCount.objects.get(scope=scope).count,
+                    reconcile(scope),
+                )
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count,
+            Post.objects.filter(author=self.author).count(),
+        )
+
+    def test_counts_follow_create_edit_delete(self):
+        """Счётчики меняются при создании, правке и удалении поста."""
+        post = Post.objects.create(
+            text='Тестовый текст', author=self.author, group=self.group
+        )
+        self.assertCountsActual()
+        post.group = self.other_group
+        post.save()
+        self.assertCountsActual()
+        Post.objects.get(pk=post.pk).delete()
+        self.assertCountsActual()
+
+    def test_paginator_reads_count_store(self):
+        """Пагинатор берёт число постов из счётчика, а не из таблицы."""
+        Post.objects.create(text='Тестовый текст', author=self.author)
+        PostCount.objects.filter(scope=GLOBAL_SCOPE).update(count=42)
+        response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 42)
+
+    def test_missing_counter_is_counted_once(self):
+        """Отсутствующий счётчик считается по таблице и сохраняется."""
+        Post.objects.create(text='Тестовый текст', author=self.author)
+        PostCount.objects.all().delete()
+        self.assertEqual(get_count(GLOBAL_SCOPE), 1)
+        self.assertTrue(PostCount.objects.filter(scope=GLOBAL_SCOPE).exists())
+
+    def test_reconcile_command_fixes_drift(self):
+        """Команда сверки исправляет разошедшиеся счётчики."""
+        Post.objects.create(
+            text='Тестовый текст', author=self.author, group=self.group
+        )
+        PostCount.objects.update(count=100)
+        call_command('reconcile_post_counts', stdout=StringIO())
+        self.assertEqual(get_count(GLOBAL_SCOPE), 1)
+        self.assertEqual(get_count(group_scope(self.group.pk)), 1)
+
+    def test_rebuild_author_stats_command(self):
+        """Команда пересчитывает разошедшуюся статистику авторов."""
+        Post.objects.create(text='Тестовый текст', author=self.author)
+        AuthorStats.objects.update(posts_count=100)
+        call_command('rebuild_author_stats', stdout=StringIO())
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 1
+        )
+
+    def test_author_posts_count_shown(self):
+        """Профиль и пост показывают число постов автора из статистики."""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        AuthorStats.objects.filter(author=self.author).update(posts_count=42)
+        client = Client()
+        pages = (
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': post.id}),
+        )
+        for page in pages:
+            with self.subTest(page=page):
+                self.assertContains(client.get(page), '42')
+
+    def test_missing_author_stats_rebuilt_on_post_page(self):
+        """Без строки статистики пост показывает число постов автора,
+        посчитанное заново, а не 0."""
+        post = Post.objects.create(text='Тестовый текст', author=self.author)
+        AuthorStats.objects.filter(author=self.author).delete()
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': post.id})
+        )
+        self.assertEqual(response.context['author_posts_count'], 1)
@@ -0,0 +1,53 @@
+import csv
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Group, Post, User
+
+
+class ExportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(text='Первый пост', author=cls.author),
+            Post.objects.create(
+                text='Второй пост', author=cls.author, group=cls.group
+            ),
+        ]
+
+    def export(self, suffix, *args):
+        path = tempfile.mktemp(suffix=suffix)
+        self.addCleanup(os.unlink, path)
+        call_command('export_posts', path, *args, stderr=StringIO())
+        return path
+
+    def test_export_jsonl(self):
+        """Выгрузка JSONL содержит посты по порядку с автором и группой."""
+        with open(self.export('.jsonl'), encoding='utf-8') as source:
+            rows = [json.loads(line) for line in source]
+        self.assertEqual([row['id'] for row in rows],
+                         [post.id for post in self.posts])
+        self.assertEqual(rows[1]['author'], 'Автор')
+        self.assertEqual(rows[1]['group'], 'test_slug')
+        self.assertEqual(rows[1]['pub_date'],
+                         self.posts[1].pub_date.isoformat())
+
+    def test_incremental_gzip_csv(self):
+        """С --since-id выгружаются только новые посты, .gz сжимается."""
+        path = self.export('.csv.gz', f'--since-id={self.posts[0].id}')
+        with gzip.open(path, 'rt', encoding='utf-8', newline='') as source:
+            rows = list(csv.DictReader(source))
+        self.assertEqual([row['text'] for row in rows], ['Второй пост'])
@@ -0,0 +1,126 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TransactionTestCase
+from django.urls import reverse
+
+from .. import feed_cache
+from ..models import Group, Post, User
+
+
+class FeedCacheTests(TransactionTestCase):
+    """Кэш сбрасывается и после фиксации записи, поэтому тесты идут
+    без общей транзакции."""
+
+    def setUp(self):
+        self.author = User.objects.create_user(username='Автор')
+        self.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        self.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other_slug',
+            description='Тестовое описание',
+        )
+        self.post = Post.objects.create(
+            text='Тестовый текст', author=self.author, group=self.group
+        )
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+        self.index = reverse('posts:index')
+        self.group_page = reverse(
+            'posts:group_list', kwargs={'slug': self.group.slug}
+        )
+        self.other_group_page = reverse(
+            'posts:group_list', kwargs={'slug': self.other_group.slug}
+        )
+        self.profile = reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        )
+
+    def is_cached(self, url):
+        """Страница отдана из кэша, если шаблон не рендерился."""
+        return self.guest_client.get(url).context is None
+
+    def test_anonymous_pages_cached(self):
+        """Повторный запрос ленты гостем отдаётся из кэша."""
+        for url in (self.index, self.group_page, self.profile):
+            with self.subTest(url=url):
+                self.assertFalse(self.is_cached(url))
+                self.assertTrue(self.is_cached(url))
+                self.assertFalse(self.is_cached(url + '?page=2'))
+
+    def test_authorized_pages_not_cached(self):
+        """Авторизованному пользователю лента не отдаётся из кэша."""
+        self.guest_client.get(self.index)
+        response = self.authorized_client.get(self.index)
+        self.assertIsNotNone(response.context)
+
+    def test_write_invalidates_affected_scopes_only(self):
+        """Запись поста сбрасывает только затронутые ленты."""
+        urls = (self.index, self.group_page, self.other_group_page,
+                self.profile)
+        for url in urls:
+            self.guest_client.get(url)
+        Post.objects.create(
+            text='Новый пост', author=self.author, group=self.group
+        )
+        self.assertFalse(self.is_cached(self.index))
+        self.assertFalse(self.is_cached(self.group_page))
+        self.assertFalse(self.is_cached(self.profile))
+        self.assertTrue(self.is_cached(self.other_group_page))
+
+    def test_invalidated_after_commit(self):
+        """Страница, сохранённая в кэш до фиксации записи, после
+        фиксации не отдаётся: её могли собрать из старых строк."""
+        with transaction.atomic():
+            Post.objects.create(text='Новый пост', author=self.author)
+            self.guest_client.get(self.index)
+            self.assertTrue(self.is_cached(self.index))
+        self.assertFalse(self.is_cached(self.index))
+
+    def test_edit_invalidates_old_and_new_group(self):
+        """Перенос поста в другую группу сбрасывает обе группы."""
+        self.guest_client.get(self.group_page)
+        self.guest_client.get(self.other_group_page)
+        self.authorized_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            data={'text': 'Изменённый текст', 'group': self.other_group.id},
+        )
+        self.assertFalse(self.is_cached(self.group_page))
+        self.assertFalse(self.is_cached(self.other_group_page))
+
+    def test_group_change_invalidates_author_profiles(self):
+        """Изменение и удаление группы сбрасывает профили её авторов,
+        где выводится группа поста."""
+        group = Group.objects.create(title='Группа', slug='group')
+        Post.objects.create(text='Пост', author=self.author, group=group)
+        self.guest_client.get(self.profile)
+        group.title = 'Новый заголовок'
+        group.save()
+        response = self.guest_client.get(self.profile)
+        self.assertContains(response, 'Новый заголовок')
+        self.assertTrue(self.is_cached(self.profile))
+        group.delete()
+        response = self.guest_client.get(self.profile)
+        self.assertNotContains(response, 'Новый заголовок')
+
+    def test_hit_miss_metrics(self):
+        """Попадания и промахи кэша выводятся в /metrics."""
+        index_more = reverse('posts:index_more')
+        for url in (self.index, self.index, index_more):
+            self.guest_client.get(url)
+        self.assertEqual(feed_cache.stats()[('index', 'hit')], 1)
+        self.assertEqual(feed_cache.stats()[('index', 'miss')], 1)
+        self.assertEqual(feed_cache.stats()[('index_more', 'miss')], 1)
+        response = self.guest_client.get(reverse('metrics'))
+        for labels in ('view="index",result="hit"} 1',
+                       'view="index_more",result="miss"} 1',
+                       'view="profile_more",result="hit"} 0'):
+            with self.subTest(labels=labels):
+                self.assertContains(
+                    response, 'yatube_feed_cache_requests_total{' + labels
+                )
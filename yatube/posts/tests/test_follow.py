@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetTestMixin
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+
+class FollowTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.follower = User.objects.create_user(username='Подписчик')
+        cls.stranger = User.objects.create_user(username='Посторонний')
+        cls.old_post = Post.objects.create(
+            text='Пост до подписки', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+        self.stranger_client = Client()
+        self.stranger_client.force_login(self.stranger)
+        self.follow_url = reverse(
+            'posts:profile_follow', kwargs={'username': self.author}
+        )
+        self.unfollow_url = reverse(
+            'posts:profile_unfollow', kwargs={'username': self.author}
+        )
+        self.feed_url = reverse('posts:follow_index')
+
+    def feed(self, client):
+        return list(client.get(self.feed_url).context['page_obj'])
+
+    def test_follow_and_unfollow(self):
+        """Подписка переносит посты автора в ленту, отписка убирает их."""
+        self.assertWithinQueryBudget(self.follower_client, self.follow_url)
+        self.assertTrue(Follow.objects.filter(
+            user=self.follower, author=self.author
+        ).exists())
+        self.assertEqual(self.feed(self.follower_client), [self.old_post])
+        self.assertWithinQueryBudget(self.follower_client, self.unfollow_url)
+        self.assertEqual(self.feed(self.follower_client), [])
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 0
+        )
+
+    def test_new_post_fanned_out_to_followers_only(self):
+        """Новый пост попадает в ленты подписчиков, но не остальных."""
+        self.follower_client.get(self.follow_url)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.follower, post=post
+        ).exists())
+        self.assertEqual(self.feed(self.follower_client)[0], post)
+        self.assertEqual(self.feed(self.stranger_client), [])
+        self.assertWithinQueryBudget(self.follower_client, self.feed_url)
+
+    def test_self_follow_ignored(self):
+        """На себя подписаться нельзя."""
+        client = Client()
+        client.force_login(self.author)
+        client.get(self.follow_url)
+        self.assertFalse(Follow.objects.filter(author=self.author).exists())
+
+    @override_settings(TIMELINE_FAN_OUT_LIMIT=2)
+    def test_large_author_read_on_demand(self):
+        """Посты автора с большим числом подписчиков не раскладываются,
+        а подмешиваются в ленту при чтении."""
+        self.follower_client.get(self.follow_url)
+        self.stranger_client.get(self.follow_url)
+        stats = AuthorStats.objects.get(author=self.author)
+        self.assertTrue(stats.fan_out_on_read)
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertFalse(
+            TimelineEntry.objects.filter(post__author=self.author).exists()
+        )
+        for client in (self.follower_client, self.stranger_client):
+            with self.subTest(client=client):
+                response = client.get(self.feed_url)
+                self.assertEqual(
+                    list(response.context['page_obj']), [post, self.old_post]
+                )
+                self.assertEqual(response.context['page_obj'].paginator.count,
+                                 2)
@@ -0,0 +1,72 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..benchmarks import query_plan
+from ..forms import PostForm
+from ..group_choices import search_groups
+from ..models import Group, Post, User
+
+
+class GroupChoicesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test_slug', description='-'
+        )
+        Group.objects.create(
+            title='Другая группа', slug='other', description='-'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_choices_cached_until_groups_change(self):
+        """Список групп формы берётся из кэша и обновляется
+        при записи групп."""
+        str(PostForm()['group'])
+        with self.assertNumQueries(0):
+            field = str(PostForm()['group'])
+        self.assertIn('Тестовая группа', field)
+        Group.objects.create(title='Новая группа', slug='new', description='-')
+        self.assertIn('Новая группа', str(PostForm()['group']))
+
+    @override_settings(GROUP_CHOICES_LIMIT=1)
+    def test_many_groups_use_autocomplete(self):
+        """Если групп больше лимита, форма выводит только выбранную
+        группу, а прочие ищутся по началу названия или slug без учёта
+        регистра."""
+        field = str(PostForm(instance=self.post)['group'])
+        self.assertIn('data-autocomplete', field)
+        self.assertIn('Тестовая группа', field)
+        self.assertNotIn('Другая группа', field)
+        # Названия групп из импорта записываются через bulk_create.
+        Group.objects.bulk_create([
+            Group(title='Клуб ЧГК', slug='chgk', description='-')
+        ])
+        url = reverse('posts:group_autocomplete')
+        for query, slugs in (('тест', ['test_slug']), ('ТЕСТ', ['test_slug']),
+                             ('тЕсТовая г', ['test_slug']),
+                             ('клуб чгк', ['chgk']), ('OTH', ['other']),
+                             ('группа', []), ('', [])):
+            with self.subTest(query=query):
+                results = self.client.get(url, {'q': query}).json()
+                self.assertEqual(
+                    [group['slug'] for group in results['results']], slugs
+                )
+
+    def test_prefix_search_uses_title_index(self):
+        """Поиск по префиксу названия идёт по индексу."""
+        plan = query_plan(search_groups('Тест'))
+        self.assertIn(
+            'USING INDEX group_title_lower_idx '
+            '(title_lower>? AND title_lower<?)',
+            plan,
+        )
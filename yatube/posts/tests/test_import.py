@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..counters import GLOBAL_SCOPE, get_count, group_scope
+from ..models import AuthorStats, Follow, Group, Post, TimelineEntry, User
+from ..search import search_posts
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.follower = User.objects.create_user(username='Подписчик')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_file(self, suffix, content):
+        with tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding='utf-8', delete=False
+        ) as source:
+            source.write(content)
+        self.addCleanup(os.unlink, source.name)
+        call_command(
+            'import_posts', source.name, batch_size=2, transaction_size=4,
+            stdout=StringIO(), stderr=StringIO(),
+        )
+
+    def test_import_jsonl(self):
+        """Посты из JSONL загружаются с авторами, группами и датами,
+        неверные строки пропускаются."""
+        rows = [
+            {'text': 'Импорт 1', 'author': 'Автор', 'group': 'test_slug',
+             'pub_date': '2020-01-02T03:04:05'},
+            {'text': 'Импорт 2', 'author': 'Новый', 'group': 'new_slug',
+             'group_title': 'Новая группа'},
+            {'text': 'Импорт 3', 'author': 'Новый'},
+            {'author': 'Без текста'},
+        ]
+        self.import_file('.jsonl', '\n'.join(
+            [json.dumps(row) for row in rows] + ['{broken']
+        ))
+        self.assertEqual(Post.objects.count(), 3)
+        post = Post.objects.get(text='Импорт 1')
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(
+            Group.objects.get(slug='new_slug').title, 'Новая группа'
+        )
+        self.assertFalse(User.objects.filter(username='Без текста').exists())
+        self.assertEqual(User.objects.get(username='Новый').posts.count(), 2)
+
+    def test_import_refreshes_derived_data(self):
+        """После загрузки верны счётчики, поиск и ленты подписок."""
+        self.import_file('.csv', (
+            'text,author,group\n'
+            'Импорт из CSV,Автор,test_slug\n'
+            'Ещё пост,Автор,\n'
+        ))
+        self.assertEqual(get_count(GLOBAL_SCOPE), 2)
+        self.assertEqual(get_count(group_scope(self.group.pk)), 1)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, 2
+        )
+        self.assertEqual(search_posts('csv').get().text, 'Импорт из CSV')
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.follower).count(), 2
+        )
+
+    def test_failed_import_refreshes_committed_posts(self):
+        """Если файл обрывается ошибкой, для уже зафиксированных
+        постов пересчитываются счётчики, поиск и ленты подписок."""
+        rows = ''.join(
+            json.dumps({'text': f'Импорт {i} ' + 'x' * 500, 'author': 'Автор'})
+            + '\n'
+            for i in range(40)
+        )
+        with tempfile.NamedTemporaryFile(
+            'wb', suffix='.jsonl', delete=False
+        ) as source:
+            source.write(rows.encode() + b'\xff\xfe\n')
+        self.addCleanup(os.unlink, source.name)
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_posts', source.name, batch_size=2,
+                transaction_size=4, stdout=StringIO(), stderr=StringIO(),
+            )
+        imported = Post.objects.count()
+        self.assertGreater(imported, 0)
+        self.assertEqual(get_count(GLOBAL_SCOPE), imported)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).posts_count, imported
+        )
+        self.assertEqual(search_posts('импорт').count(), imported)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.follower).count(),
+            imported,
+        )
@@ -0,0 +1,20 @@
+from django.test import TestCase
+
+from ..benchmarks import feed_querysets, query_plan, seed_posts, uses_sort_step
+
+
+class FeedIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors, cls.groups = seed_posts(300, authors=3, groups=3)
+
+    def test_feeds_walk_index_without_sort(self):
+        """Запросы лент идут по составным индексам без сортировки."""
+        querysets = feed_querysets(self.groups[1], self.authors[1])
+        self.assertEqual(len(querysets), 6)
+        for name, queryset in querysets.items():
+            with self.subTest(feed=name):
+                plan = query_plan(queryset)
+                self.assertIn('feed_idx', plan)
+                self.assertFalse(uses_sort_step(plan), plan)
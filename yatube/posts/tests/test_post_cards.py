@@ -0,0 +1,61 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..templatetags.post_cards import card_key
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Авторизованному клиенту страницы лент не кэшируются целиком.
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.pages = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        )
+
+    def card(self):
+        return Post.objects.select_related('author', 'group').get(
+            pk=self.post.pk
+        )
+
+    def test_pages_use_cached_card(self):
+        """Ленты собираются из готовых карточек из кэша."""
+        self.client.get(self.pages[0])
+        key = card_key(self.card())
+        self.assertIn('Тестовый текст', cache.get(key))
+        cache.set(key, 'Карточка из кэша')
+        for page in self.pages:
+            with self.subTest(page=page):
+                self.assertContains(self.client.get(page), 'Карточка из кэша')
+
+    def test_card_changes_with_post_and_group(self):
+        """Изменение поста или его группы даёт новую карточку."""
+        self.client.get(self.pages[0])
+        post = self.card()
+        post.text = 'Новый текст'
+        post.save()
+        self.group.title = 'Новый заголовок'
+        self.group.save()
+        for page in self.pages:
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, 'Новый текст')
+                self.assertContains(response, 'Новый заголовок')
@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.query_budget import QueryBudgetTestMixin
+from ..models import Group, Post, User
+from ..utils import POSTS_PER_PAGE
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        for i in range(POSTS_PER_PAGE + 1):
+            author = User.objects.create_user(username=f'Автор{i}')
+            group = Group.objects.create(
+                title=f'Группа {i}', slug=f'slug_{i}', description='-'
+            )
+            Post.objects.create(text=f'Текст {i}', author=author, group=group)
+            Post.objects.create(
+                text=f'Текст {i}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.filter(author=cls.author).first()
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client_author = Client()
+        self.authorized_client_author.force_login(self.author)
+
+    def test_pages_within_query_budget(self):
+        """Страницы укладываются в объявленный бюджет SQL-запросов."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:index_more'),
+            reverse('posts:group_list_more', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile_more', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.id}),
+            reverse('posts:post_create'),
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+        )
+        for client in (self.guest_client, self.authorized_client_author):
+            for url in urls:
+                with self.subTest(url=url):
+                    self.assertWithinQueryBudget(client, url)
+
+    def test_writes_within_query_budget(self):
+        """Создание и правка поста укладываются в бюджет запросов."""
+        form_data = {'text': 'Новый текст', 'group': self.group.id}
+        self.assertWithinQueryBudget(
+            self.authorized_client_author,
+            reverse('posts:post_create'),
+            method='post',
+            data=form_data,
+        )
+        self.assertWithinQueryBudget(
+            self.authorized_client_author,
+            reverse('posts:post_edit', kwargs={'post_id': self.post.id}),
+            method='post',
+            data=form_data,
+        )
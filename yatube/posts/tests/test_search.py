@@ -0,0 +1,112 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..search import rebuild_index, search_posts
+from ..utils import POSTS_PER_PAGE
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_superuser(
+            username='Автор', email='author@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Ёжик в тумане', author=cls.author, group=cls.group
+        )
+        cls.other_post = Post.objects.create(
+            text='Туман над рекой, туман в поле', author=cls.author
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.author)
+
+    def test_search_ranked(self):
+        """Поиск находит посты по префиксу слова и ранжирует их."""
+        self.assertEqual(
+            list(search_posts('туман')), [self.other_post, self.post]
+        )
+        self.assertEqual(list(search_posts('ЕЖ')), [self.post])
+        self.assertEqual(list(search_posts('ёжик река')), [])
+        self.assertEqual(list(search_posts('!!!')), [])
+
+    def test_index_follows_writes(self):
+        """Индекс обновляется при создании, правке и удалении поста."""
+        post = Post.objects.create(text='Новый пост', author=self.author)
+        self.assertEqual(list(search_posts('новый')), [post])
+        post.text = 'Исправленный пост'
+        post.save()
+        self.assertEqual(list(search_posts('новый')), [])
+        self.assertEqual(list(search_posts('исправленный')), [post])
+        post.delete()
+        self.assertEqual(list(search_posts('исправленный')), [])
+
+    def test_rebuild_index(self):
+        """Перестроение индекса подхватывает посты, созданные в обход
+        сигналов."""
+        post, = Post.objects.bulk_create(
+            [Post(text='Загружен пачкой', author=self.author)]
+        )
+        self.assertEqual(list(search_posts('пачкой')), [])
+        rebuild_index()
+        self.assertEqual(search_posts('пачкой').get().text, post.text)
+
+    def test_search_page(self):
+        """Страница поиска показывает результаты и сохраняет запрос
+        в ссылках пагинатора."""
+        Post.objects.bulk_create(
+            Post(text=f'Туман {i}', author=self.author)
+            for i in range(POSTS_PER_PAGE)
+        )
+        rebuild_index()
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'туман'}
+        )
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(len(response.context['page_obj']), POSTS_PER_PAGE)
+        self.assertContains(response, '?q=%D1%82%D1%83%D0%BC%D0%B0%D0%BD'
+                                      '&amp;page=2')
+        response = self.guest_client.get(reverse('posts:search'))
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_search_page_window(self):
+        """Результаты поиска на нескольких страницах выводят окно
+        номеров страниц с пропусками."""
+        Post.objects.bulk_create(
+            Post(text=f'Туман {i}', author=self.author)
+            for i in range(POSTS_PER_PAGE * 7)
+        )
+        rebuild_index()
+        response = self.guest_client.get(
+            reverse('posts:search'), {'q': 'туман'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(
+            page_obj.page_window, [1, 2, 3, page_obj.paginator.ELLIPSIS, 8]
+        )
+        for number in (3, 8):
+            with self.subTest(number=number):
+                self.assertContains(
+                    response, f'&amp;page={number}">{number}</a>'
+                )
+        self.assertContains(response, page_obj.paginator.ELLIPSIS)
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идёт по полнотекстовому индексу."""
+        response = self.authorized_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'ёжик'}
+        )
+        self.assertEqual(
+            list(response.context['cl'].result_list), [self.post]
+        )
@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+
+from ..counters import GLOBAL_SCOPE, get_count
+from ..models import Post
+
+SEED_POSTS = 600
+
+
+class SeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, seed=7):
+        call_command(
+            'seed', posts=SEED_POSTS, authors=30, groups=10, days=20,
+            end='2024-03-01', seed=seed, batch_size=100, stdout=StringIO(),
+        )
+        rows = list(
+            Post.objects.order_by('id').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            )
+        )
+        Post.objects.all().delete()
+        return rows
+
+    def test_same_seed_gives_same_data(self):
+        """Одинаковый seed даёт те же посты, другой — другие."""
+        first = self.seed()
+        self.assertEqual(len(first), SEED_POSTS)
+        self.assertEqual(self.seed(), first)
+        self.assertNotEqual(self.seed(seed=8), first)
+
+    def test_skewed_distributions(self):
+        """Посты идут по возрастанию даты, авторы распределены
+        неравномерно, счётчики пересчитаны."""
+        call_command(
+            'seed', posts=SEED_POSTS, authors=30, groups=10, days=20,
+            stdout=StringIO(),
+        )
+        self.assertEqual(get_count(GLOBAL_SCOPE), SEED_POSTS)
+        dates = list(
+            Post.objects.order_by('id').values_list('pub_date', flat=True)
+        )
+        self.assertEqual(dates, sorted(dates))
+        per_author = sorted(
+            Post.objects.order_by().values('author').annotate(
+                count=Count('id')
+            ).values_list('count', flat=True),
+            reverse=True,
+        )
+        self.assertGreater(per_author[0], 5 * per_author[len(per_author) // 2])
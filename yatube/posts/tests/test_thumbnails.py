@@ -0,0 +1,97 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post, PostThumbnail, User
+from ..thumbnails import make_thumbnails
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(width=700, height=350):
+    content = BytesIO()
+    Image.new('RGB', (width, height), 'orange').save(content, 'PNG')
+    return SimpleUploadedFile(
+        'small.png', content.getvalue(), content_type='image/png'
+    )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Автор')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.author)
+
+    def test_create_post_with_image(self):
+        """Пост создаётся с картинкой из формы."""
+        response = self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой', 'image': image_file(),
+        })
+        self.assertRedirects(response, reverse(
+            'posts:profile', kwargs={'username': self.author}
+        ))
+        post = Post.objects.get(text='Пост с картинкой')
+        self.assertTrue(post.image.name.startswith('posts/small'))
+
+    def test_feed_uses_ready_thumbnails(self):
+        """Копии всех ширин готовятся заранее, лента показывает
+        их в srcset, а копии шире оригинала не создаются."""
+        post = Post.objects.create(
+            text='Пост с картинкой', author=self.author, image=image_file()
+        )
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'srcset')
+        make_thumbnails(post.pk)
+        thumbnails = list(PostThumbnail.objects.filter(post=post))
+        self.assertEqual(
+            [thumbnail.width for thumbnail in thumbnails], [320, 640, 700]
+        )
+        response = self.client.get(reverse('posts:index'))
+        for thumbnail in thumbnails:
+            self.assertContains(
+                response, f'{thumbnail.url} {thumbnail.width}w'
+            )
+
+    def test_rolled_back_thumbnails_removed(self):
+        """Если замена копий откатилась, нарисованные файлы удаляются,
+        а следующий запуск рисует их заново."""
+        post = Post.objects.create(
+            text='Пост с картинкой', author=self.author, image=image_file()
+        )
+        before = cached_files()
+        with mock.patch(
+            'posts.thumbnails.complete', side_effect=ValueError
+        ), self.assertRaises(ValueError):
+            make_thumbnails(post.pk)
+        self.assertFalse(PostThumbnail.objects.filter(post=post).exists())
+        self.assertEqual(cached_files(), before)
+        make_thumbnails(post.pk)
+        self.assertEqual(len(cached_files() - before), 3)
+
+
+def cached_files():
+    return {
+        name
+        for _, _, names in os.walk(os.path.join(TEMP_MEDIA_ROOT, 'cache'))
+        for name in names
+    }
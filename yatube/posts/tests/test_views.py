@@ -1,9 +1,10 @@
 from django import forms
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from ..models import Group, Post, User
-from ..utils import POSTS_PER_PAGE
+from ..utils import POSTS_PER_PAGE, CursorPaginator
 
 POSTS_FOR_TEST = 15
 
@@ -30,6 +31,7 @@ class ProjectViewTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -194,6 +196,7 @@ class PaginatorViewsTest(TestCase):
             )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
 
     def test_correct_paginator(self):
@@ -212,3 +215,77 @@ class PaginatorViewsTest(TestCase):
                 self.assertEqual(count_posts_p1, POSTS_PER_PAGE)
                 self.assertEqual(count_posts_p2,
                                  POSTS_FOR_TEST - POSTS_PER_PAGE)
+
+    def test_cursor_paginator(self):
+        """Переход по курсору продолжает ленту без пропусков и повторов."""
+        response_p1 = self.guest_client.get(reverse('posts:index'))
+        page_p1 = response_p1.context['page_obj']
+        response_p2 = self.guest_client.get(
+            reverse('posts:index') + f'?after={page_p1.next_cursor}'
+        )
+        page_p2 = response_p2.context['page_obj']
+        self.assertTrue(page_p2.is_cursor)
+        self.assertFalse(page_p2.has_next())
+        self.assertEqual(len(page_p2), POSTS_FOR_TEST - POSTS_PER_PAGE)
+        self.assertEqual(
+            list(page_p1) + list(page_p2),
+            list(Post.objects.order_by('-pub_date', '-id')),
+        )
+        response_back = self.guest_client.get(
+            reverse('posts:index') + f'?before={page_p2.previous_cursor}'
+        )
+        self.assertEqual(list(response_back.context['page_obj']),
+                         list(page_p1))
+
+    def test_broken_cursor_shows_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index') + '?after=broken'
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    def test_page_window(self):
+        """Навигация показывает окно номеров страниц с пропусками,
+        сколько бы страниц ни было."""
+        paginator = CursorPaginator(
+            Post.objects.all(), POSTS_PER_PAGE, count=10 ** 6
+        )
+        gap = paginator.ELLIPSIS
+        windows = (
+            (1, [1, 2, 3, gap, 100000]),
+            (5, [1, 2, 3, 4, 5, 6, 7, gap, 100000]),
+            (5000, [1, gap, 4998, 4999, 5000, 5001, 5002, gap, 100000]),
+            (100000, [1, gap, 99998, 99999, 100000]),
+        )
+        for number, window in windows:
+            with self.subTest(number=number):
+                self.assertEqual(
+                    paginator.get_page(number).page_window, window
+                )
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'].page_window, [1, 2])
+
+    def test_load_more_fragments(self):
+        """Кнопка «Показать ещё» подгружает только карточки следующей
+        порции, без макета страницы."""
+        feeds = (
+            ('posts:index', 'posts:index_more', {}),
+            ('posts:group_list', 'posts:group_list_more',
+             {'slug': self.group.slug}),
+            ('posts:profile', 'posts:profile_more',
+             {'username': self.author.username}),
+        )
+        for feed, more, kwargs in feeds:
+            with self.subTest(feed=feed):
+                page = self.guest_client.get(reverse(feed, kwargs=kwargs))
+                cursor = page.context['page_obj'].next_cursor
+                more_url = f'{reverse(more, kwargs=kwargs)}?after={cursor}'
+                self.assertContains(page, f'data-load-more="{more_url}"')
+                response = self.guest_client.get(more_url)
+                self.assertNotContains(response, '<html')
+                self.assertNotContains(response, 'data-load-more')
+                self.assertEqual(
+                    list(page.context['page_obj'])
+                    + list(response.context['page_obj']),
+                    list(Post.objects.order_by('-pub_date', '-id')),
+                )
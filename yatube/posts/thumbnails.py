@@ -0,0 +1,76 @@
+"""Уменьшенные копии картинок постов.
+
+Копии всех ширин из POST_THUMBNAIL_WIDTHS готовит фоновая задача после
+сохранения поста, а шаблоны берут только готовые адреса из
+PostThumbnail: движок миниатюр во время запроса не вызывается.
+Копии рисуются вне транзакции, в короткой остаётся только замена строк.
+"""
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import default, get_thumbnail
+
+from core.tasks import LeaseLost, complete, task
+from .models import Post, PostThumbnail
+
+
+@task('posts.make_thumbnails', background=True)
+def make_thumbnails(post_id):
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=post_id
+    ).first()
+    if post is None:
+        return
+    images = {}
+    if post.image:
+        for width in settings.POST_THUMBNAIL_WIDTHS:
+            # Картинка не увеличивается: копии шире оригинала совпадут
+            # с ним по размеру, и останется одна.
+            thumbnail = get_thumbnail(post.image, str(width), quality=85)
+            images.setdefault(thumbnail.width, thumbnail)
+    try:
+        with transaction.atomic():
+            PostThumbnail.objects.filter(post=post).delete()
+            PostThumbnail.objects.bulk_create(
+                PostThumbnail(
+                    post=post, width=width,
+                    height=image.height, url=image.url,
+                )
+                for width, image in images.items()
+            )
+            # Новая дата изменения меняет ключ кэша карточки и сбрасывает
+            # ленты с постом.
+            post.save(update_fields=['updated'])
+            complete()
+    except LeaseLost:
+        # Те же файлы запишет новый владелец задачи.
+        raise
+    except Exception:
+        discard(post_id, images.values())
+        raise
+
+
+def discard(post_id, images):
+    """Удаляет копии, на которые после отката не ссылается PostThumbnail.
+
+    Запись о копии убирается и из хранилища sorl: иначе get_thumbnail
+    вернул бы удалённый файл, не нарисовав его заново.
+    """
+    kept = set(PostThumbnail.objects.filter(post_id=post_id).values_list(
+        'url', flat=True
+    ))
+    for image in images:
+        if image.url not in kept:
+            default.kvstore.delete(image, delete_thumbnails=False)
+            image.delete()
+
+
+def attach_thumbnails(posts):
+    """Кладёт в post.ready_thumbnails готовые копии картинки, одним
+    запросом для всех постов с картинками."""
+    with_image = {post.pk: post for post in posts if post.image}
+    for post in posts:
+        post.ready_thumbnails = []
+    if not with_image:
+        return
+    for thumbnail in PostThumbnail.objects.filter(post__in=list(with_image)):
+        with_image[thumbnail.post_id].ready_thumbnails.append(thumbnail)
@@ -1,10 +1,190 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .counters import get_count
 
 
 POSTS_PER_PAGE = 10
+# Номеров страниц в навигации по обе стороны от текущей и у краёв
+PAGE_WINDOW_SIDE = 2
+PAGE_WINDOW_ENDS = 1
+FEED_ORDERING = ('-pub_date', '-id')
+
+
+def encode_cursor(pub_date, pk):
+    """Кодирует позицию поста в ленте в непрозрачный токен."""
+    raw = f'{pub_date.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Возвращает (pub_date, id) из токена или None для испорченного."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        pub_date, pk = raw.decode().rsplit('|', 1)
+        pub_date, pk = parse_datetime(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class NumberedPage(Page):
+    is_cursor = False
+
+    @cached_property
+    def page_window(self):
+        """Номера страниц для навигации, с пропусками."""
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class FeedPage(NumberedPage):
+    @property
+    def next_cursor(self):
+        if self.has_next():
+            return encode_cursor(self[-1].pub_date, self[-1].pk)
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous():
+            return encode_cursor(self[0].pub_date, self[0].pk)
+        return None
+
+
+class CursorPage(FeedPage):
+    """Страница, полученная переходом по курсору, а не по номеру."""
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        super().__init__(object_list, None, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
 
 
-def post_paginator(queryset, request):
-    paginator = Paginator(queryset, POSTS_PER_PAGE)
+class ElidedPaginator(Paginator):
+    """Paginator, страницы которого выводят в навигации окно номеров
+    с пропусками, а не все номера подряд."""
+
+    def _get_page(self, *args, **kwargs):
+        return NumberedPage(*args, **kwargs)
+
+    # Совпадает с Paginator.get_elided_page_range из Django 3.2.
+    ELLIPSIS = '…'
+
+    def get_elided_page_range(self, number=1, on_each_side=PAGE_WINDOW_SIDE,
+                              on_ends=PAGE_WINDOW_ENDS):
+        """Первые и последние on_ends страниц и on_each_side страниц
+        вокруг number, пропуски между ними заменены на ELLIPSIS.
+
+        В отличие от page_range длина списка не зависит от числа страниц.
+        """
+        number = self.validate_number(number)
+        num_pages = self.num_pages
+        if num_pages <= (on_each_side + on_ends) * 2:
+            return list(self.page_range)
+        window = []
+        if number > on_each_side + on_ends + 2:
+            window += [*range(1, on_ends + 1), self.ELLIPSIS]
+            window += range(number - on_each_side, number + 1)
+        else:
+            window += range(1, number + 1)
+        if number < num_pages - on_each_side - on_ends - 1:
+            window += range(number + 1, number + on_each_side + 1)
+            window += [self.ELLIPSIS, *range(num_pages - on_ends + 1,
+                                             num_pages + 1)]
+        else:
+            window += range(number + 1, num_pages + 1)
+        return window
+
+
+class CursorPaginator(ElidedPaginator):
+    """Paginator ленты постов с переходом по ключу (pub_date, id).
+
+    Переход по курсору не использует OFFSET и не считает записи,
+    поэтому глубокие страницы стоят столько же, сколько первая.
+    Для нумерованных страниц число постов берётся из счётчика области
+    scope или передаётся готовым в count, а не из COUNT(*) по таблице.
+    """
+
+    def __init__(self, object_list, per_page, scope=None, count=None,
+                 **kwargs):
+        super().__init__(
+            object_list.order_by(*FEED_ORDERING), per_page, **kwargs
+        )
+        self.scope = scope
+        if count is not None:
+            self.count = count
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return super().count
+        return get_count(self.scope)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+    def cursor_queryset(self, cursor, backwards=False):
+        """Посты после позиции cursor или, при backwards, перед ней."""
+        pub_date, pk = cursor
+        # Условие записано через <= и NOT, а не через OR, чтобы база
+        # начинала обход индекса сразу с позиции курсора.
+        if backwards:
+            return self.object_list.filter(
+                Q(pub_date__gte=pub_date) & ~Q(pub_date=pub_date, pk__lte=pk)
+            ).reverse()
+        return self.object_list.filter(
+            Q(pub_date__lte=pub_date) & ~Q(pub_date=pub_date, pk__gte=pk)
+        )
+
+    def get_cursor_page(self, after=None, before=None):
+        cursor = decode_cursor(after or before or '')
+        if cursor is None:
+            return self.get_page(1)
+        queryset = self.cursor_queryset(cursor, backwards=not after)
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if after:
+            return CursorPage(items, self, has_more, True)
+        if not has_more:
+            return self.get_page(1)
+        return CursorPage(items[::-1], self, True, True)
+
+
+def post_paginator(queryset, request, scope=None, count=None):
+    paginator = CursorPaginator(queryset, POSTS_PER_PAGE, scope, count)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        return paginator.get_cursor_page(after=after, before=before)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def fragment_page(queryset, request):
+    """Страница для подгрузки ленты: переход только по курсору after,
+    без номера страницы и подсчёта постов."""
+    paginator = CursorPaginator(queryset, POSTS_PER_PAGE)
+    cursor = decode_cursor(request.GET.get('after', ''))
+    rows = paginator.object_list
+    if cursor is not None:
+        rows = paginator.cursor_queryset(cursor)
+    items = list(rows[:POSTS_PER_PAGE + 1])
+    return CursorPage(
+        items[:POSTS_PER_PAGE], paginator,
+        len(items) > POSTS_PER_PAGE, cursor is not None,
+    )
@@ -1,64 +1,191 @@
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import redirect, render, get_object_or_404
+from django.urls import reverse
 
-from .models import Post, Group, User
+from core.query_budget import query_budget
+from core.write_queue import serialized_write
+from . import feed_cache, group_choices, search as post_search, timeline
+from .conditional import (conditional_page, group_list_state, index_state,
+                          post_detail_state, profile_state)
+from .counters import GLOBAL_SCOPE, author_posts_count, group_scope
+from .models import Follow, Post, Group, User
+from .thumbnails import attach_thumbnails
 from .forms import PostForm
-from .utils import post_paginator
+from .utils import (ElidedPaginator, POSTS_PER_PAGE, fragment_page,
+                    post_paginator)
 
 
+@query_budget(8)
+@conditional_page(index_state)
+@feed_cache.cache_feed('index', lambda: feed_cache.INDEX_SCOPE)
 def index(request):
-    context = {'page_obj': post_paginator(Post.objects.all(), request)}
+    context = {
+        'page_obj': post_paginator(
+            Post.objects.select_related('author', 'group'),
+            request,
+            GLOBAL_SCOPE,
+        ),
+        'feed_url': request.path,
+        'more_url': reverse('posts:index_more'),
+    }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(10)
+@conditional_page(group_list_state)
+@feed_cache.cache_feed('group_list', feed_cache.group_list_scope)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     context = {
         'group': group,
-        'page_obj': post_paginator(group.posts.all(), request),
+        'page_obj': post_paginator(
+            group.posts.select_related('author', 'group'),
+            request,
+            group_scope(group.pk),
+        ),
+        'feed_url': request.path,
+        'more_url': reverse('posts:group_list_more', kwargs={'slug': slug}),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@query_budget(9)
+@conditional_page(profile_state)
+@feed_cache.cache_feed('profile', feed_cache.profile_scope)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username
+    )
+    following = (
+        request.user.is_authenticated
+        and request.user != author
+        and Follow.objects.filter(user=request.user, author=author).exists()
+    )
     context = {
         'author': author,
+        'following': following,
         'page_obj': post_paginator(
-            author.posts.select_related('author'),
-            request
+            author.posts.select_related('author', 'group'),
+            request,
+            count=author_posts_count(author),
+        ),
+        'feed_url': request.path,
+        'more_url': reverse(
+            'posts:profile_more', kwargs={'username': username}
         ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+def feed_fragment(request, queryset, feed_url):
+    """Следующие карточки ленты и ссылка на продолжение, без макета
+    страницы: их подгружает скрипт load_more.js."""
+    context = {
+        'page_obj': fragment_page(queryset, request),
+        'feed_url': feed_url,
+        'more_url': request.path,
+    }
+    return render(request, 'posts/includes/feed_fragment.html', context)
+
+
+@query_budget(5)
+@conditional_page(index_state)
+@feed_cache.cache_feed('index_more', lambda: feed_cache.INDEX_SCOPE)
+def index_more(request):
+    return feed_fragment(
+        request,
+        Post.objects.select_related('author', 'group'),
+        reverse('posts:index'),
+    )
+
+
+@query_budget(7)
+@conditional_page(group_list_state)
+@feed_cache.cache_feed('group_list_more', feed_cache.group_list_scope)
+def group_posts_more(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_fragment(
+        request,
+        group.posts.select_related('author', 'group'),
+        reverse('posts:group_list', kwargs={'slug': slug}),
+    )
+
+
+@query_budget(6)
+@conditional_page(profile_state)
+@feed_cache.cache_feed('profile_more', feed_cache.profile_scope)
+def profile_more(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_fragment(
+        request,
+        author.posts.select_related('author', 'group'),
+        reverse('posts:profile', kwargs={'username': username}),
+    )
+
+
+@query_budget(5)
+@conditional_page(post_detail_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__post_stats', 'group'),
+        id=post_id,
+    )
+    attach_thumbnails([post])
     context = {
         'post': post,
+        'author_posts_count': author_posts_count(post.author),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(5)
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = post_search.search_posts(
+        query, Post.objects.select_related('author', 'group')
+    )
+    context = {
+        'query': query,
+        'page_obj': ElidedPaginator(posts, POSTS_PER_PAGE).get_page(
+            request.GET.get('page')
+        ),
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@query_budget(3)
+def group_autocomplete(request):
+    """Группы по началу названия или slug для поля группы в форме."""
+    groups = group_choices.search_groups(request.GET.get('q', ''))
+    return JsonResponse({
+        'results': list(groups.values('id', 'title', 'slug')),
+    })
+
+
+@query_budget(12)
 @login_required
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        form.save()
+        serialized_write(form.save)
         return redirect('posts:profile', post.author)
     return render(request, 'posts/post_create.html', {'form': form})
 
 
+@query_budget(13)
 @login_required
 def post_edit(request, post_id):
     is_edit = True
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(Post.objects.select_related('author'), id=post_id)
     if request.user == post.author:
-        form = PostForm(request.POST or None, instance=post)
+        form = PostForm(
+            request.POST or None, files=request.FILES or None, instance=post
+        )
         if form.is_valid():
-            form.save()
+            serialized_write(form.save)
             return redirect('posts:post_detail', post_id)
         context = {
             'is_edit': is_edit,
@@ -67,3 +194,37 @@ def post_edit(request, post_id):
         }
         return render(request, 'posts/post_create.html', context)
     return redirect('posts:post_create')
+
+
+@query_budget(6)
+@login_required
+def follow_index(request):
+    posts, count = timeline.follow_feed(request.user)
+    context = {
+        'page_obj': post_paginator(
+            posts.select_related('author', 'group'), request, count=count
+        ),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@query_budget(12)
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        serialized_write(
+            Follow.objects.get_or_create, user=request.user, author=author
+        )
+    return redirect('posts:profile', username)
+
+
+@query_budget(8)
+@login_required
+def profile_unfollow(request, username):
+    serialized_write(
+        Follow.objects.filter(
+            user=request.user, author__username=username
+        ).delete
+    )
+    return redirect('posts:profile', username)
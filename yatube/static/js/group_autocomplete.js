@@ -0,0 +1,62 @@
+// Поиск группы в форме поста. Когда групп слишком много для списка,
+// в <select data-autocomplete> приходит только выбранная группа.
+// Скрипт добавляет перед ним поле поиска и по введённому началу
+// названия подставляет в список группы из data-autocomplete.
+(function () {
+  'use strict';
+
+  var DELAY_MS = 200;
+
+  function attach(select) {
+    var input = document.createElement('input');
+    input.type = 'search';
+    input.className = 'form-control mb-2';
+    input.placeholder = 'Начало названия группы';
+    input.setAttribute('aria-label', 'Поиск группы');
+    select.parentNode.insertBefore(input, select);
+
+    var timer = null;
+    var latest = 0;
+
+    function show(results) {
+      var keep = Array.prototype.filter.call(select.options, function (option) {
+        return !option.value || option.selected;
+      });
+      select.innerHTML = '';
+      keep.forEach(function (option) {
+        select.appendChild(option);
+      });
+      results.forEach(function (group) {
+        if (String(group.id) === select.value) {
+          return;
+        }
+        select.appendChild(new Option(group.title, group.id));
+      });
+      select.size = Math.min(select.options.length, 8);
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var request = ++latest;
+        var url = select.dataset.autocomplete +
+          '?q=' + encodeURIComponent(input.value);
+        fetch(url, {credentials: 'same-origin'})
+          .then(function (response) {
+            return response.json();
+          })
+          .then(function (data) {
+            // Ответ на устаревший запрос не затирает свежий.
+            if (request === latest) {
+              show(data.results);
+            }
+          });
+      }, DELAY_MS);
+    });
+    select.addEventListener('change', function () {
+      select.size = 0;
+    });
+  }
+
+  document.querySelectorAll('select[data-autocomplete]').forEach(attach);
+})();
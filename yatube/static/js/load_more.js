@@ -0,0 +1,61 @@
+// Подгрузка ленты без перерисовки страницы. Кнопка «Показать ещё»
+// ведёт на следующую страницу и работает без скрипта. Скрипт берёт
+// из data-load-more адрес фрагмента с карточками и заменяет им блок
+// кнопки; во фрагменте приходит кнопка следующей порции. Когда кнопка
+// показывается на экране, порция загружается сама.
+(function () {
+  'use strict';
+
+  var observer = null;
+
+  function load(link) {
+    if (link.dataset.loading) {
+      return;
+    }
+    link.dataset.loading = '1';
+    link.classList.add('disabled');
+    fetch(link.dataset.loadMore, {credentials: 'same-origin'})
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        var fragment = document.createElement('template');
+        fragment.innerHTML = html;
+        var next = fragment.content.querySelector('[data-load-more]');
+        link.closest('[data-load-more-box]').replaceWith(fragment.content);
+        if (next) {
+          watch(next);
+        }
+      })
+      .catch(function () {
+        // Остаётся обычный переход по ссылке.
+        delete link.dataset.loading;
+        link.classList.remove('disabled');
+      });
+  }
+
+  function watch(link) {
+    link.addEventListener('click', function (event) {
+      event.preventDefault();
+      load(link);
+    });
+    if (observer) {
+      observer.observe(link);
+    }
+  }
+
+  if ('IntersectionObserver' in window) {
+    observer = new IntersectionObserver(function (entries) {
+      entries.forEach(function (entry) {
+        if (entry.isIntersecting) {
+          observer.unobserve(entry.target);
+          load(entry.target);
+        }
+      });
+    }, {rootMargin: '400px'});
+  }
+  document.querySelectorAll('[data-load-more]').forEach(watch);
+})();
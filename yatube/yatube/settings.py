@@ -27,6 +27,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Превышение query_budget у view завершается ошибкой
+QUERY_BUDGET_ENFORCE = DEBUG
+
 # List of URLs
 
 LOGIN_URL = 'users:login'
@@ -44,6 +47,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
     'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'users.apps.UsersConfig',
     'django.contrib.auth',
@@ -51,9 +55,13 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.ReplicaReadsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,7 +75,8 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates с замером времени рендера для метрик
+        'BACKEND': 'core.template_backend.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -88,11 +97,105 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.sqlite3 — SQLite с профилем PRAGMA (WAL, synchronous=NORMAL, mmap)
+# и повтором запросов при занятой базе. Соединения постоянные.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': None,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+        },
+    }
+}
+
+# Запись через очередь единственного потока-писателя. Нужна, когда
+# сервер обслуживает запросы в нескольких потоках одного процесса.
+SQLITE_WRITE_QUEUE = os.environ.get('YATUBE_SQLITE_WRITE_QUEUE') == '1'
+
+# Реплики для чтения: алиасы из DATABASES. Локально их можно завести
+# как копии SQLite-файла, указав их число в YATUBE_SQLITE_REPLICAS,
+# и обновлять командой replicate_sqlite.
+DATABASE_REPLICAS = []
+for number in range(1, int(os.environ.get('YATUBE_SQLITE_REPLICAS', 0)) + 1):
+    DATABASES[f'replica{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, f'db.replica{number}.sqlite3'),
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает основную базу
+REPLICA_STICKY_SECONDS = 10
+
+
+# Cache
+# Для нескольких процессов нужен общий бэкенд (memcached, redis),
+# иначе сброс кэша лент виден только в процессе, сделавшем запись.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Время жизни кэша страниц лент для анонимных посетителей, секунд
+FEED_CACHE_TIMEOUT = 60 * 5
+# Карточки постов версионированы, поэтому хранятся долго.
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Начиная с этого числа подписчиков посты автора не раскладываются
+# по лентам подписок при публикации, а подмешиваются при чтении
+TIMELINE_FAN_OUT_LIMIT = 10000
+
+# Сколько групп форма поста показывает списком; если групп больше,
+# группа выбирается поиском по началу названия
+GROUP_CHOICES_LIMIT = 200
+
+
+# Metrics
+# Каталог, через который воркеры складывают метрики запросов для
+# /metrics. Без него /metrics показывает только свой процесс.
+
+METRICS_DIR = os.environ.get('YATUBE_METRICS_DIR')
+METRICS_FLUSH_SECONDS = 5
+
+# Запросы дольше SLOW_QUERY_MS миллисекунд пишутся в SLOW_QUERY_LOG
+# вместе с планом. None выключает журнал. Отчёт: slow_query_report.
+SLOW_QUERY_MS = (
+    float(os.environ['YATUBE_SLOW_QUERY_MS'])
+    if os.environ.get('YATUBE_SLOW_QUERY_MS') else None
+)
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, 'slow_queries.log')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 3,
+            'formatter': 'message',
+            'encoding': 'utf-8',
+            # Файл создаётся только при первой записи.
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -137,3 +240,34 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'static')
 ]
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+
+# Tasks
+# Побочные работы записи (поисковый индекс, раскладка по лентам,
+# миниатюры) идут через core.tasks. С YATUBE_TASK_QUEUE=1 задачи
+# сохраняются в базу вместе с записью и выполняются воркерами
+# manage.py run_workers, без неё — сразу, а фоновые — в пуле
+# TASK_WORKERS потоков процесса.
+
+TASK_QUEUE = os.environ.get('YATUBE_TASK_QUEUE') == '1'
+TASK_WORKERS = 2
+TASK_BATCH_SIZE = 100
+TASK_POLL_SECONDS = 1
+# Повтор упавшей задачи через TASK_RETRY_SECONDS, 2x, 4x... секунд
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_SECONDS = 10
+# Задачу упавшего воркера другой воркер возьмёт через столько секунд
+TASK_LEASE_SECONDS = 60 * 5
+
+
+# Thumbnails
+# Ширины уменьшенных копий картинок постов для srcset. Копии готовит
+# фоновая задача после сохранения поста.
+
+POST_THUMBNAIL_WIDTHS = (320, 640, 960)
+# sorl-thumbnail: копии не бывают больше оригинала
+THUMBNAIL_UPSCALE = False